@@ -0,0 +1,38 @@
+import sys
+import argparse
+
+import harness
+import suite
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs benchmarks for linear and calculus hot paths')
+    parser.add_argument('--filter', default='', help='only run benchmarks with this substring in the name')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimal measured time per case in seconds')
+    parser.add_argument('--save', help='save the report as a JSON baseline')
+    parser.add_argument('--compare', help='compare the report with a JSON baseline and fail on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression')
+    args = parser.parse_args()
+
+    def log(key, result):
+        print '%-28s %14.1f ops/sec %10d allocs %10d KB' % (key, result['ops_per_sec'], result['allocations'],
+                                                           result['peak_memory_kb'])
+
+    benchmarks = [b for b in harness.registry if args.filter in b.name]
+    report = harness.run(benchmarks, args.min_time, log)
+
+    if args.save:
+        harness.save(report, args.save)
+
+    if args.compare:
+        regressions = harness.compare(harness.load(args.compare), report, args.tolerance)
+
+        for regression in regressions:
+            print 'REGRESSION', regression
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import gc
+import json
+import resource
+import timeit
+import multiprocessing
+
+from linear import instrumentation
+
+
+class BenchmarkRegression(Exception):
+    """ An exception raised when a benchmark run is worse than a saved baseline """
+    pass
+
+
+class Benchmark(object):
+    def __init__(self, name, setup, sizes):
+        """ Constructs a benchmark from a setup function that takes a size and returns a callable to measure """
+
+        self._name = name
+        self._setup = setup
+        self._sizes = sizes
+
+    def key(self, size):
+        """ Returns a key that identifies a benchmark case in a report """
+
+        return '%s[%d]' % (self._name, size)
+
+    @property
+    def name(self):
+        """ Returns a benchmark name """
+
+        return self._name
+
+    @property
+    def setup(self):
+        """ Returns a benchmark setup function """
+
+        return self._setup
+
+    @property
+    def sizes(self):
+        """ Returns a list of sizes the benchmark is run with """
+
+        return self._sizes
+
+
+# All registered benchmarks in the registration order
+registry = []
+
+
+def benchmark(name, sizes):
+    """ Registers a decorated setup function as a benchmark over a sweep of sizes """
+
+    def register(setup):
+        registry.append(Benchmark(name, setup, sizes))
+        return setup
+
+    return register
+
+
+def measure(run, min_time=0.2):
+    """ Returns the number of calls per second of a callable, averaged over at least min_time seconds """
+
+    number = 1
+
+    while True:
+        elapsed = min(timeit.repeat(run, number=number, repeat=3))
+
+        if elapsed >= min_time:
+            return number / elapsed
+
+        number *= max(2, int(min_time / max(elapsed, 1e-6)))
+
+
+def _run_case(setup, size, min_time, queue):
+    """ Measures a single benchmark case, this runs in a separate process to isolate the peak memory """
+
+    run = setup(size)
+    gc.collect()
+    memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Vector and Matrix instances created by a single call, counted by the instrumentation of the linear package
+    with instrumentation.instrument() as report:
+        run()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memory
+    allocations = sum(report.allocations.values())
+    queue.put({'ops_per_sec': measure(run, min_time), 'allocations': allocations, 'peak_memory_kb': peak})
+
+
+def run(benchmarks=None, min_time=0.2, log=None):
+    """ Runs benchmarks and returns a report that maps each case to its ops/sec, allocations and peak memory """
+
+    report = {}
+
+    for b in benchmarks if benchmarks is not None else registry:
+        for size in b.sizes:
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=_run_case, args=(b.setup, size, min_time, queue))
+            process.start()
+            report[b.key(size)] = queue.get()
+            process.join()
+
+            if log is not None:
+                log(b.key(size), report[b.key(size)])
+
+    return report
+
+
+def save(report, path):
+    """ Saves a report as a JSON baseline """
+
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    """ Loads a JSON baseline """
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, report, tolerance=0.2):
+    """ Compares a report with a baseline and returns a list of regressions described as strings """
+
+    regressions = []
+
+    for key in sorted(report):
+        if key not in baseline:
+            continue
+
+        old, new = baseline[key], report[key]
+
+        if new['ops_per_sec'] < old['ops_per_sec'] * (1.0 - tolerance):
+            regressions.append('%s: %.1f ops/sec, baseline %.1f' % (key, new['ops_per_sec'], old['ops_per_sec']))
+
+        if new['allocations'] > old['allocations'] * (1.0 + tolerance):
+            regressions.append('%s: %d allocations, baseline %d' % (key, new['allocations'], old['allocations']))
+
+        if new['peak_memory_kb'] > max(old['peak_memory_kb'] * (1.0 + tolerance), old['peak_memory_kb'] + 1024):
+            regressions.append('%s: %d KB peak memory, baseline %d KB' % (key, new['peak_memory_kb'], old['peak_memory_kb']))
+
+    return regressions
+
+
+def check(baseline, report, tolerance=0.2):
+    """ Raises BenchmarkRegression if a report is worse than a baseline """
+
+    regressions = compare(baseline, report, tolerance)
+
+    if regressions:
+        raise BenchmarkRegression('\n'.join(regressions))
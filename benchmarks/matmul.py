@@ -0,0 +1,52 @@
+import sys
+import random
+import timeit
+
+from linear import Matrix
+from linear import multiply
+
+
+def reference_multiply(a, b):
+    """ Multiplies two matrices by a dot product of each row with each column """
+
+    result = Matrix(a.rows, b.cols)
+
+    for i in range(0, result.rows):
+        for j in range(0, result.cols):
+            result[i][j] = a[i] * b.column(j)
+
+    return result
+
+
+def random_matrix(size):
+    """ Constructs a square matrix filled with random values """
+
+    return Matrix.from_rows([[random.uniform(-1.0, 1.0) for j in range(size)] for i in range(size)])
+
+
+def measure(f, repeat):
+    """ Returns the best wall time of a function call in seconds """
+
+    return min(timeit.repeat(f, number=1, repeat=repeat))
+
+
+def run(sizes, repeat=3):
+    """ Compares the reference multiplication with the blocked, parallel and NumPy kernels """
+
+    print '%6s %14s %14s %14s %14s' % ('size', 'reference', 'blocked', 'parallel', 'numpy')
+
+    for size in sizes:
+        a, b = random_matrix(size), random_matrix(size)
+        runs = repeat if size < 500 else 1
+
+        reference = measure(lambda: reference_multiply(a, b), runs)
+        blocked = measure(lambda: multiply.gemm_blocked(a, b), runs)
+        parallel = measure(lambda: multiply.gemm_parallel(a, b), runs)
+        vectorized = measure(lambda: multiply.gemm_numpy(a, b), runs) if multiply.numpy is not None else None
+
+        print '%6d %13.4fs %13.4fs %13.4fs %14s' % (size, reference, blocked, parallel,
+                                                   '%.4fs' % vectorized if vectorized is not None else '-')
+
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [10, 100, 500])
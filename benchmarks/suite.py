@@ -0,0 +1,111 @@
+import random
+from math import cos, sin
+
+from linear import Matrix
+from linear import Vector
+from linear import lazy
+from linear.algorithms import gauss_elimination, det, null_space, column_space, gram_schmidt
+from calculus import Polynomial, newton_solver, euler_approximation
+
+from harness import benchmark
+
+
+def random_vector(size):
+    """ Constructs a vector filled with random values """
+
+    return Vector([random.uniform(-1.0, 1.0) for i in range(size)])
+
+
+def random_matrix(rows, cols):
+    """ Constructs a matrix filled with random values """
+
+    return Matrix.from_rows([[random.uniform(-1.0, 1.0) for j in range(cols)] for i in range(rows)])
+
+
+@benchmark('vector.construct', [3, 100, 1000])
+def vector_construct(size):
+    values = [random.uniform(-1.0, 1.0) for i in range(size)]
+    return lambda: Vector(values)
+
+
+@benchmark('vector.add', [3, 10, 100, 1000])
+def vector_add(size):
+    a, b = random_vector(size), random_vector(size)
+    return lambda: a + b
+
+
+@benchmark('vector.dot', [3, 10, 100, 1000])
+def vector_dot(size):
+    a, b = random_vector(size), random_vector(size)
+    return lambda: a * b
+
+
+@benchmark('vector.scale', [10, 100, 1000])
+def vector_scale(size):
+    a = random_vector(size)
+    return lambda: 2.5 * a
+
+
+@benchmark('matrix.mul', [10, 50, 100])
+def matrix_mul(size):
+    a, b = random_matrix(size, size), random_matrix(size, size)
+    return lambda: a * b
+
+
+@benchmark('expression.chain', [10, 50, 100])
+def expression_chain(size):
+    a, b, v = random_matrix(size, size), random_matrix(size, size), random_vector(size)
+    return lambda: (lazy(a) * b * v).evaluate()
+
+
+@benchmark('matrix.copy', [10, 100, 500])
+def matrix_copy(size):
+    a = random_matrix(size, size)
+    return lambda: a.copy()
+
+
+@benchmark('gauss_elimination', [10, 30, 60])
+def gauss(size):
+    a = random_matrix(size, size)
+    return lambda: gauss_elimination(a)
+
+
+@benchmark('det', [10, 30, 60])
+def determinant(size):
+    a = random_matrix(size, size)
+    return lambda: det(a)
+
+
+@benchmark('null_space', [10, 30, 60])
+def null(size):
+    a = random_matrix(size, 2 * size)
+    return lambda: null_space(a)
+
+
+@benchmark('column_space', [10, 30, 60])
+def columns(size):
+    a = random_matrix(size, 2 * size)
+    return lambda: column_space(a)
+
+
+@benchmark('gram_schmidt', [3, 10, 30])
+def orthogonalization(size):
+    basis = [random_vector(size) for i in range(size)]
+    return lambda: gram_schmidt(basis)
+
+
+@benchmark('polynomial.call', [5, 50, 500])
+def polynomial_call(size):
+    p = Polynomial(*[random.uniform(-1.0, 1.0) for i in range(size + 1)])
+    return lambda: p(0.75)
+
+
+@benchmark('newton_solver', [3, 9, 27])
+def newton(size):
+    p = Polynomial(*([1.0] + [0.0] * (size - 1) + [-2.0]))
+    return lambda: newton_solver(1.5, p)
+
+
+@benchmark('euler_approximation', [100, 1000, 10000])
+def euler(size):
+    return lambda: euler_approximation(0.0, 10.0, size, sin, cos)
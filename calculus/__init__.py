@@ -1,2 +1,5 @@
-from polynomial import Polynomial
+from polynomial import Polynomial, interpolate
 from algorithms import *
+from roots import RootReport, newton_many, find_roots
+from integration import Integral, integrate, gauss_kronrod, adaptive_simpson, romberg
+from iteration import FixedPointReport, FixedPointError, iterate
@@ -1,4 +1,7 @@
+from linear import instrumentation
 from polynomial import Polynomial
+from iteration import iterate, FixedPointError, PICARD
+from roots import CONVERGED
 
 
 def odd(n):
@@ -7,25 +10,25 @@ def odd(n):
     return 2*n + 1
 
 
-def fixed_point(f, initial, eps=1e-10):
-    """ Computes a fixed point of a function """
+def fixed_point(f, initial, eps=1e-10, method=PICARD, max_iterations=1000):
+    """ Computes a fixed point of a function, raises when the iteration does not converge.
 
-    y = f(initial)
+        Use iterate for a convergence report instead.
+    """
 
-    while True:
-        e = f(y) - y
+    report = iterate(f, initial, eps, method, max_iterations)
 
-        if abs(e) < eps:
-            break
+    if report.status != CONVERGED:
+        raise FixedPointError("Fixed point iteration did not converge: " + report.status)
 
-        y += e
-
-    return y
+    return report.value
 
 
 def euler_approximation(initial, value, steps, f, df_dx):
     """ Computes the function value for a given input by an Euler's approximation method """
 
+    f = instrumentation.counted(f, 'euler_approximation')
+    df_dx = instrumentation.counted(df_dx, 'euler_approximation')
     result = 0
     dx = float(value - initial) / steps
 
@@ -40,9 +43,10 @@ def newton_solver(x0, f, eps=1e-10):
 
     assert isinstance(f, Polynomial)
 
+    df_dx = instrumentation.counted(f.derivative, 'newton_solver')
+    f = instrumentation.counted(f, 'newton_solver')
     x = x0
     y = f(x)
-    df_dx = f.derivative
     result = [x0]
 
     while abs(y) > eps:
@@ -0,0 +1,154 @@
+import cmath
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Shorter operands are multiplied by a schoolbook kernel
+KARATSUBA_THRESHOLD = 32
+
+# Products of at least this many coefficients are computed with a fast Fourier transform
+FFT_THRESHOLD = 512
+
+
+def convolve(a, b):
+    """ Returns a convolution of two coefficient lists, the coefficients of a product of two polynomials """
+
+    if not a or not b:
+        return []
+
+    if min(len(a), len(b)) <= KARATSUBA_THRESHOLD:
+        return schoolbook(a, b)
+
+    if len(a) + len(b) - 1 >= FFT_THRESHOLD:
+        return fft_convolve(a, b)
+
+    return karatsuba(a, b)
+
+
+def schoolbook(a, b):
+    """ Convolves two coefficient lists with a quadratic number of multiplications """
+
+    if len(a) < len(b):
+        a, b = b, a
+
+    n = len(b)
+    result = [0.0] * (len(a) + n - 1)
+
+    # Accumulate one scaled copy of the longer operand per coefficient of the shorter one
+    for i, v in enumerate(b):
+        if v:
+            result[i:i + len(a)] = [r + v * x for r, x in zip(result[i:i + len(a)], a)]
+
+    return result
+
+
+def karatsuba(a, b):
+    """ Convolves two coefficient lists with a Karatsuba's method, three half size products per split """
+
+    if len(a) < len(b):
+        a, b = b, a
+
+    n, m = len(a), len(b)
+
+    if m <= KARATSUBA_THRESHOLD:
+        return schoolbook(a, b)
+
+    result = [0.0] * (n + m - 1)
+
+    # Unbalanced operands are split into slices of the shorter operand length that are multiplied separately
+    if 2 * m <= n:
+        for i in xrange(0, n, m):
+            _add_at(result, karatsuba(a[i:i + m], b), i)
+
+        return result
+
+    k = n // 2
+    a0, a1, b0, b1 = a[:k], a[k:], b[:k], b[k:]
+
+    z0 = karatsuba(a0, b0)
+    z2 = karatsuba(a1, b1) if b1 else []
+    z1 = karatsuba(_sum(a0, a1), _sum(b0, b1))
+
+    _add_at(z1, [-v for v in z0], 0)
+    _add_at(z1, [-v for v in z2], 0)
+
+    _add_at(result, z0, 0)
+    _add_at(result, z1, k)
+    _add_at(result, z2, 2 * k)
+
+    return result
+
+
+def fft_convolve(a, b):
+    """ Convolves two coefficient lists with a fast Fourier transform, uses NumPy if it is available """
+
+    size = len(a) + len(b) - 1
+    n = 1 << (size - 1).bit_length()
+
+    if numpy is not None:
+        return list(numpy.fft.irfft(numpy.fft.rfft(a, n) * numpy.fft.rfft(b, n), n)[:size])
+
+    fa = _fft([complex(v) for v in a] + [0j] * (n - len(a)), False)
+    fb = _fft([complex(v) for v in b] + [0j] * (n - len(b)), False)
+
+    result = _fft([x * y for x, y in zip(fa, fb)], True)
+
+    return [v.real / n for v in result[:size]]
+
+
+def _fft(values, inverse):
+    """ Runs an iterative radix-2 fast Fourier transform on a list of a power of two length """
+
+    n = len(values)
+    result = list(values)
+
+    # Reorder the values by bit reversed indices
+    j = 0
+    for i in xrange(1, n):
+        bit = n >> 1
+
+        while j & bit:
+            j ^= bit
+            bit >>= 1
+
+        j |= bit
+
+        if i < j:
+            result[i], result[j] = result[j], result[i]
+
+    length = 2
+    sign = 1.0 if inverse else -1.0
+
+    while length <= n:
+        half = length >> 1
+        roots = [cmath.exp(sign * 2j * cmath.pi * k / length) for k in xrange(half)]
+
+        for start in xrange(0, n, length):
+            for k in xrange(half):
+                u = result[start + k]
+                v = result[start + k + half] * roots[k]
+                result[start + k] = u + v
+                result[start + k + half] = u - v
+
+        length <<= 1
+
+    return result
+
+
+def _sum(a, b):
+    """ Returns an elementwise sum of two coefficient lists aligned at the first coefficient """
+
+    if len(a) < len(b):
+        a, b = b, a
+
+    return [x + y for x, y in zip(a, b)] + a[len(b):]
+
+
+def _add_at(target, values, offset):
+    """ Adds values to a target list starting at a given offset """
+
+    end = offset + len(values)
+    target[offset:end] = [x + y for x, y in zip(target[offset:end], values)]
@@ -0,0 +1,205 @@
+import heapq
+from collections import namedtuple
+
+from polynomial import Polynomial
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Outcome of a numerical integration with an error estimate and a number of integrand evaluations
+Integral = namedtuple('Integral', ['value', 'error', 'evaluations', 'status'])
+
+CONVERGED = 'converged'
+MAX_EVALUATIONS = 'max evaluations'
+
+# Integration methods
+GAUSS_KRONROD = 'gauss-kronrod'
+SIMPSON = 'simpson'
+ROMBERG = 'romberg'
+
+# Nodes of a 15 point Kronrod rule on [-1, 1] from the largest, odd ones are the nodes of a 7 point Gauss rule
+KRONROD_NODES = (0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                 0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                 0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                 0.207784955007898467600689403773245, 0.0)
+
+KRONROD_WEIGHTS = (0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                   0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                   0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                   0.204432940075298892414161999234649, 0.209482141084727828012999174891714)
+
+GAUSS_WEIGHTS = (0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                 0.381830050505118944950369775488975, 0.417959183673469387755102040816327)
+
+
+def integrate(f, a, b, eps=1e-10, method=GAUSS_KRONROD, vectorized=False, max_evaluations=10000):
+    """ Computes a definite integral of a function over [a, b] to a given absolute accuracy """
+
+    methods = {GAUSS_KRONROD: gauss_kronrod, SIMPSON: adaptive_simpson, ROMBERG: romberg}
+
+    if method not in methods:
+        raise ValueError("Unknown integration method: " + str(method))
+
+    return methods[method](f, a, b, eps, vectorized, max_evaluations)
+
+
+def gauss_kronrod(f, a, b, eps=1e-10, vectorized=False, max_evaluations=10000):
+    """ Integrates with a globally adaptive 7-15 point Gauss-Kronrod rule.
+
+        The interval with the largest error estimate is bisected until the total estimate drops below eps,
+        the embedded Gauss rule reuses the Kronrod nodes, so each interval costs 15 evaluations.
+    """
+
+    evaluate = _Evaluator(f, vectorized)
+    value, error = _kronrod(evaluate, a, b)
+    intervals = [(-error, a, b, value)]
+
+    while error > eps:
+        if evaluate.count + 30 > max_evaluations:
+            return Integral(value, error, evaluate.count, MAX_EVALUATIONS)
+
+        negative_error, lo, hi, part = heapq.heappop(intervals)
+        middle = 0.5 * (lo + hi)
+        left, left_error = _kronrod(evaluate, lo, middle)
+        right, right_error = _kronrod(evaluate, middle, hi)
+
+        heapq.heappush(intervals, (-left_error, lo, middle, left))
+        heapq.heappush(intervals, (-right_error, middle, hi, right))
+
+        # Sum the parts again instead of updating the totals, so that rounding errors do not accumulate
+        value = sum(interval[3] for interval in intervals)
+        error = -sum(interval[0] for interval in intervals)
+
+    return Integral(value, error, evaluate.count, CONVERGED)
+
+
+def adaptive_simpson(f, a, b, eps=1e-10, vectorized=False, max_evaluations=10000):
+    """ Integrates with an adaptive Simpson's rule with a Richardson correction.
+
+        Intervals are refined level by level, so that all new nodes of a level are evaluated as a single batch.
+    """
+
+    evaluate = _Evaluator(f, vectorized)
+    middle = 0.5 * (a + b)
+    fa, fm, fb = evaluate([a, middle, b])
+
+    # Each interval is a (lo, hi, f(lo), f(middle), f(hi), simpson, tolerance, error) tuple
+    active = [(a, b, fa, fm, fb, _simpson(a, b, fa, fm, fb), eps, float('inf'))]
+    value = error = 0.0
+
+    while active:
+        if evaluate.count + 2 * len(active) > max_evaluations:
+            value += sum(interval[5] for interval in active)
+            return Integral(value, error + sum(interval[7] for interval in active), evaluate.count, MAX_EVALUATIONS)
+
+        nodes = []
+
+        for lo, hi, f_lo, f_middle, f_hi, whole, tolerance, estimate in active:
+            middle = 0.5 * (lo + hi)
+            nodes.extend((0.5 * (lo + middle), 0.5 * (middle + hi)))
+
+        values = evaluate(nodes)
+        refined = []
+
+        for i, (lo, hi, f_lo, f_middle, f_hi, whole, tolerance, estimate) in enumerate(active):
+            middle = 0.5 * (lo + hi)
+            f_left, f_right = values[2 * i], values[2 * i + 1]
+            left = _simpson(lo, middle, f_lo, f_left, f_middle)
+            right = _simpson(middle, hi, f_middle, f_right, f_hi)
+            delta = left + right - whole
+
+            if abs(delta) <= 15.0 * tolerance or middle in (lo, hi):
+                value += left + right + delta / 15.0
+                error += abs(delta) / 15.0
+            else:
+                # Until the halves are refined, split the error estimate of this interval between them
+                estimate = abs(delta) / 30.0
+                refined.append((lo, middle, f_lo, f_left, f_middle, left, 0.5 * tolerance, estimate))
+                refined.append((middle, hi, f_middle, f_right, f_hi, right, 0.5 * tolerance, estimate))
+
+        active = refined
+
+    return Integral(value, error, evaluate.count, CONVERGED)
+
+
+def romberg(f, a, b, eps=1e-10, vectorized=False, max_evaluations=10000):
+    """ Integrates with a Romberg extrapolation of trapezoidal rules with halved steps.
+
+        Each level evaluates only the new midpoints, as a single batch, suits smooth integrands best.
+    """
+
+    evaluate = _Evaluator(f, vectorized)
+    h = float(b - a)
+    fa, fb = evaluate([a, b])
+    previous = [0.5 * h * (fa + fb)]
+    count = 1
+
+    while True:
+        if evaluate.count + count > max_evaluations:
+            return Integral(previous[-1], float('inf') if len(previous) < 2 else abs(previous[-1] - previous[-2]),
+                            evaluate.count, MAX_EVALUATIONS)
+
+        h *= 0.5
+        midpoints = sum(evaluate([a + (2 * i + 1) * h for i in xrange(count)]))
+        current = [0.5 * previous[0] + h * midpoints]
+        count *= 2
+
+        # Extrapolate the trapezoidal estimates, each column removes the next even power of the step from the error
+        factor = 1.0
+
+        for k in xrange(1, len(previous) + 1):
+            factor *= 4.0
+            current.append(current[k - 1] + (current[k - 1] - previous[k - 1]) / (factor - 1.0))
+
+        error = abs(current[-1] - previous[-1])
+        previous = current
+
+        if error <= eps and len(current) > 4:
+            return Integral(current[-1], error, evaluate.count, CONVERGED)
+
+
+def _simpson(lo, hi, f_lo, f_middle, f_hi):
+    """ Returns a Simpson's rule estimate over an interval """
+
+    return (hi - lo) / 6.0 * (f_lo + 4.0 * f_middle + f_hi)
+
+
+def _kronrod(evaluate, lo, hi):
+    """ Returns a 15 point Kronrod estimate over an interval and its difference from the embedded Gauss one """
+
+    center = 0.5 * (lo + hi)
+    half = 0.5 * (hi - lo)
+    offsets = [half * x for x in KRONROD_NODES[:-1]]
+    values = evaluate([center - x for x in offsets] + [center + x for x in offsets] + [center])
+
+    n = len(offsets)
+    pairs = [values[i] + values[n + i] for i in xrange(n)] + [values[-1]]
+    kronrod = sum(w * v for w, v in zip(KRONROD_WEIGHTS, pairs))
+    gauss = sum(w * v for w, v in zip(GAUSS_WEIGHTS, pairs[1::2]))
+
+    return half * kronrod, abs(half * (kronrod - gauss))
+
+
+class _Evaluator(object):
+    """ Evaluates an integrand on batches of nodes and counts the evaluations """
+
+    def __init__(self, f, vectorized):
+        self._f = f
+        self._vectorized = vectorized
+        self.count = 0
+
+    def __call__(self, nodes):
+        """ Returns a list of integrand values at given nodes """
+
+        self.count += len(nodes)
+
+        if isinstance(self._f, Polynomial):
+            return list(self._f.evaluate_many(nodes))
+
+        if self._vectorized:
+            return list(self._f(numpy.array(nodes) if numpy is not None else nodes))
+
+        return [self._f(x) for x in nodes]
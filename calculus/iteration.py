@@ -0,0 +1,157 @@
+import time
+from collections import namedtuple
+from math import sqrt
+from operator import mul, sub
+
+from linear import Matrix
+from linear import Vector
+from linear import instrumentation
+from linear import qr
+from roots import CONVERGED, DIVERGED, MAX_ITERATIONS
+
+
+# Outcome of a fixed point iteration with a residual of every iteration for convergence diagnostics
+FixedPointReport = namedtuple('FixedPointReport', ['value', 'status', 'iterations', 'evaluations', 'residual',
+                                                   'history'])
+
+TIMEOUT = 'timeout'
+
+# Fixed point iteration methods
+PICARD = 'picard'
+STEFFENSEN = 'steffensen'
+ANDERSON = 'anderson'
+
+
+class FixedPointError(Exception):
+    """ An exception class for fixed point iterations that did not converge """
+    pass
+
+
+def iterate(f, initial, eps=1e-10, method=PICARD, max_iterations=1000, timeout=None, memory=5, divergence=1e12):
+    """ Finds a fixed point x = f(x) of a scalar map or of a vector map over Vector instances.
+
+        Picard iteration applies the map, Steffensen's method extrapolates each pair of map applications with
+        an Aitken's delta-squared step, and Anderson acceleration mixes up to memory previous iterates by a least
+        squares fit of their residuals. A timeout in seconds bounds the wall time along with max_iterations.
+    """
+
+    methods = {PICARD: _picard, STEFFENSEN: _steffensen, ANDERSON: _anderson}
+
+    if method not in methods:
+        raise ValueError("Unknown fixed point method: " + str(method))
+
+    is_vector = isinstance(initial, Vector)
+    deadline = time.time() + timeout if timeout is not None else None
+    step = methods[method](memory)
+
+    def apply(values):
+        # The map sees the type of the initial point, the iteration itself runs on lists of floats
+        result = f(Vector(values)) if is_vector else f(values[0])
+        return list(result.values()) if is_vector else [float(result)]
+
+    x = list(initial.values()) if is_vector else [float(initial)]
+    history = []
+    evaluations = 0
+    status = MAX_ITERATIONS
+
+    for iteration in xrange(max_iterations + 1):
+        fx = apply(x)
+        evaluations += 1
+
+        residual = _norm(map(sub, fx, x))
+        history.append(residual)
+
+        if residual <= eps:
+            status = CONVERGED
+            break
+
+        if residual != residual or _norm(fx) > divergence:
+            status = DIVERGED
+            break
+
+        if iteration == max_iterations:
+            break
+
+        if deadline is not None and time.time() > deadline:
+            status = TIMEOUT
+            break
+
+        x, extra = step(apply, x, fx)
+        evaluations += extra
+
+    if instrumentation.active is not None:
+        instrumentation.active.evaluated('fixed_point', evaluations)
+
+    value = Vector(x) if is_vector else x[0]
+    return FixedPointReport(value, status, len(history) - 1, evaluations, history[-1], history)
+
+
+def _norm(values):
+    """ Returns a Euclidean norm of a list of values """
+
+    return sqrt(sum(map(mul, values, values)))
+
+
+def _picard(memory):
+    """ Returns a step that takes the map value as the next iterate """
+
+    return lambda apply, x, fx: (fx, 0)
+
+
+def _steffensen(memory):
+    """ Returns a step that extrapolates x, f(x) and f(f(x)) componentwise with an Aitken's delta-squared step """
+
+    def step(apply, x, fx):
+        ffx = apply(fx)
+        result = []
+
+        for x0, x1, x2 in zip(x, fx, ffx):
+            denominator = x2 - 2.0 * x1 + x0
+            result.append(x0 - (x1 - x0) ** 2 / denominator if denominator != 0 else x2)
+
+        return result, 1
+
+    return step
+
+
+def _anderson(memory):
+    """ Returns a step that mixes previous map values with weights minimizing the combined residual """
+
+    iterates = []
+
+    def step(apply, x, fx):
+        residual = map(sub, fx, x)
+        iterates.append((fx, residual))
+
+        # Differences of more iterates than the dimension are always linearly dependent
+        if len(iterates) > min(memory, len(x)) + 1:
+            iterates.pop(0)
+
+        if len(iterates) < 2:
+            return fx, 0
+
+        # Fit the latest residual by differences of the previous ones, min || g - dG * gamma ||
+        differences = [map(sub, b[1], a[1]) for a, b in zip(iterates, iterates[1:])]
+        q, r = qr.qr(Matrix.from_columns(differences))
+        n = r.rows
+
+        if n < len(differences) or any(abs(r[i][i]) <= 1e-12 * abs(r[0][0]) for i in xrange(n)):
+            # Differences became linearly dependent, restart the history from the latest iterate
+            del iterates[:-1]
+            return fx, 0
+
+        rhs = [q.column(i) * Vector(residual) for i in xrange(n)]
+        gamma = [0.0] * n
+
+        for i in xrange(n - 1, -1, -1):
+            gamma[i] = (rhs[i] - sum(r[i][j] * gamma[j] for j in xrange(i + 1, n))) / r[i][i]
+
+        result = list(fx)
+
+        for k, (a, b) in enumerate(zip(iterates, iterates[1:])):
+            result = [v - gamma[k] * (fb - fa) for v, fa, fb in zip(result, a[0], b[0])]
+
+        return result, 0
+
+    return step
+
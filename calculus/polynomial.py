@@ -1,6 +1,57 @@
+from array import array
+from collections import OrderedDict
+from math import log
+from numbers import Number
+
+from convolution import convolve
 from linear import Matrix
 from linear import Vector
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Maximum number of derivative operators kept in a cache
+OPERATOR_CACHE_SIZE = 16
+
+# Divisions with a shorter quotient or divisor run a long division instead of a Newton's reciprocal
+DIVISION_THRESHOLD = 64
+
+# Largest coefficient of a normalized reciprocal series a fast division trusts
+RECIPROCAL_GROWTH = 1e6
+
+# Subproduct tree nodes with at most this many points are evaluated with a Horner's scheme
+TREE_LEAF_SIZE = 8
+
+# Largest number of points and power of a polynomial a subproduct tree stays accurate for in floating point
+TREE_SAFE_SIZE = 32
+
+_operators = OrderedDict()
+
+
+def derivative_operator(power):
+    """ Returns a shared differentiation operator matrix for polynomials of a given power """
+
+    if power in _operators:
+        operator = _operators.pop(power)
+    else:
+        n = power + 1
+        operator = Matrix(n, n)
+        v = 1.0
+
+        for i in range(n - 1, 0, -1):
+            operator[i][i - 1] = v
+            v += 1.0
+
+        if len(_operators) >= OPERATOR_CACHE_SIZE:
+            _operators.popitem(last=False)
+
+    _operators[power] = operator
+
+    return operator
+
 
 class Polynomial(object):
     def __init__(self, *args):
@@ -10,35 +61,193 @@ class Polynomial(object):
             args = args[0].items
 
         non_zero = next((i for i, x in enumerate(args) if x), None)
-        args = args[non_zero:]
+        args = args[non_zero:] if non_zero is not None else [0.0]
 
         self._coefficients = Vector(args)
-        self._d_dx = self.d_dx
+        self._horner = list(self._coefficients.values())
 
     def __repr__(self):
         """ Converts a polynomial to a string value """
 
         def monomial(idx, coefficient):
-            return (str(coefficient) if coefficient != 1.0 else '') +\
+            return (str(coefficient) if coefficient != 1.0 or idx == self.power else '') +\
                    ('x^' + str(self.power - idx) if idx != self.power else '')
 
         return ' + '.join([monomial(i, k) for i, k in enumerate(self._coefficients)])
 
     def __call__(self, *args, **kwargs):
-        """ Evaluates value for a given input """
+        """ Evaluates value for a given input with a Horner's scheme """
 
+        x = args[0]
         value = 0.0
 
-        for i, v in enumerate(self._coefficients):
-            value += v * pow(args[0], self.power - i)
+        for v in self._horner:
+            value = value * x + v
 
         return value
 
+    def __eq__(self, other):
+        """ Returns true if both polynomials have the same coefficients """
+
+        return isinstance(other, Polynomial) and self._horner == other._horner
+
+    def __ne__(self, other):
+        """ Returns true if polynomials have different coefficients """
+
+        return not self.__eq__(other)
+
+    def __neg__(self):
+        """ Returns a polynomial with negated coefficients """
+
+        return Polynomial(*[-v for v in self._horner])
+
+    def __add__(self, other):
+        """ Returns a sum of this polynomial and a polynomial or a number """
+
+        other = _coefficients(other)
+
+        if other is None:
+            return NotImplemented
+
+        return Polynomial(*_add(self._horner, other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        """ Returns a difference of this polynomial and a polynomial or a number """
+
+        other = _coefficients(other)
+
+        if other is None:
+            return NotImplemented
+
+        return Polynomial(*_add(self._horner, [-v for v in other]))
+
+    def __rsub__(self, other):
+        """ Returns a difference of a number and this polynomial """
+
+        return (-self).__add__(other)
+
+    def __mul__(self, other):
+        """ Returns a product of this polynomial and a polynomial or a number.
+
+            Products switch from a schoolbook to a Karatsuba's method and then to a fast Fourier transform
+            with the operand lengths.
+        """
+
+        if isinstance(other, Number):
+            return Polynomial(*[v * other for v in self._horner])
+
+        if not isinstance(other, Polynomial):
+            return NotImplemented
+
+        return Polynomial(*convolve(self._horner, other._horner))
+
+    __rmul__ = __mul__
+
+    def __divmod__(self, other):
+        """ Divides this polynomial by other polynomial and returns a quotient and a remainder """
+
+        other = _coefficients(other)
+
+        if other is None:
+            return NotImplemented
+
+        quotient, remainder = _divmod(self._horner, other)
+
+        return Polynomial(*quotient), Polynomial(*remainder)
+
+    def __floordiv__(self, other):
+        """ Returns a quotient of a polynomial division """
+
+        return divmod(self, other)[0]
+
+    def __mod__(self, other):
+        """ Returns a remainder of a polynomial division """
+
+        return divmod(self, other)[1]
+
+    def gcd(self, other, eps=1e-9):
+        """ Returns a monic greatest common divisor of two polynomials by an Euclid's algorithm.
+
+            Remainder coefficients below eps relative to the dividend are treated as zero.
+        """
+
+        a, b = self._horner, _coefficients(other)
+
+        if b is None:
+            raise TypeError("A greatest common divisor is defined for polynomials and numbers only")
+
+        if len(a) < len(b):
+            a, b = b, a
+
+        while not _is_zero(b, eps * max(abs(v) for v in a)):
+            a, b = b, _divmod(a, b)[1]
+
+        return Polynomial(*[v / a[0] for v in a])
+
+    def compose(self, other):
+        """ Returns a composition of polynomials, self(other(x)) """
+
+        result = Polynomial(0.0)
+
+        for v in self._horner:
+            result = result * other + v
+
+        return result
+
+    def evaluate_many(self, xs):
+        """ Evaluates values for a list, an array or a NumPy array of inputs in a single pass """
+
+        if numpy is not None and isinstance(xs, numpy.ndarray):
+            values = numpy.zeros(xs.shape)
+
+            for v in self._horner:
+                values *= xs
+                values += v
+
+            return values
+
+        # Advance a Horner's step for all inputs at once, so the loop body is a single comprehension
+        values = [0.0] * len(xs)
+
+        for v in self._horner:
+            values = [value * x + v for value, x in zip(values, xs)]
+
+        return array('d', values) if isinstance(xs, array) else values
+
+    def nth_derivative(self, k):
+        """ Computes the k-th derivative of this polynomial """
+
+        assert k >= 0
+
+        coefficients = []
+
+        for i, v in enumerate(self._horner[:max(len(self._horner) - k, 0)]):
+            # Multiply by a falling factorial power * (power - 1) * ... * (power - k + 1)
+            for j in range(k):
+                v *= self.power - i - j
+
+            coefficients.append(v)
+
+        return Polynomial(*(coefficients or [0.0]))
+
+    def antiderivative(self, constant=0.0):
+        """ Computes the antiderivative for this polynomial with a given integration constant """
+
+        return Polynomial(*([v / (self.power - i + 1) for i, v in enumerate(self._horner)] + [constant]))
+
     @property
     def derivative(self):
         """ Computes the derivative for this polynomial """
 
-        return Polynomial(self._d_dx * self._coefficients)
+        return self.nth_derivative(1)
+
+    @property
+    def coefficients(self):
+        """ Returns the polynomial coefficients starting from the highest power """
+
+        return list(self._horner)
 
     @property
     def power(self):
@@ -48,13 +257,196 @@ class Polynomial(object):
 
     @property
     def d_dx(self):
-        n = self.power + 1
-        operator = Matrix(n, n)
-        v = 1.0
+        """ Returns a differentiation operator for polynomials of this power """
 
-        for i in range(n - 1, 0, -1):
-            operator[i][i - 1] = v
-            v += 1.0
+        return derivative_operator(self.power)
+
+
+def multipoint_evaluate(polynomial, xs):
+    """ Evaluates a polynomial at many points by reducing it down a subproduct tree of the points.
+
+        Each tree node holds a product of (x - x_i) over its points, a remainder of a node is reduced by both of
+        its children, and small nodes switch to a Horner's scheme. Floating point remainders lose accuracy
+        quickly as the tree grows, so larger evaluations fall back to a Horner's scheme of evaluate_many.
+    """
+
+    xs = list(xs)
+
+    if not xs:
+        return []
+
+    if len(xs) > TREE_SAFE_SIZE or polynomial.power > TREE_SAFE_SIZE:
+        return list(polynomial.evaluate_many(xs))
+
+    levels = _subproduct_tree(xs)
+    remainders = [_divmod(polynomial.coefficients, levels[-1][0])[1]]
+    size = 1 << (len(levels) - 1)
+
+    # Walk down the tree until a node spans only a few points
+    for level in reversed(levels[:-1]):
+        if size <= TREE_LEAF_SIZE:
+            break
+
+        size >>= 1
+        remainders = [_divmod(remainders[i // 2], node)[1] for i, node in enumerate(level)]
+
+    result = []
+
+    for i, remainder in enumerate(remainders):
+        result.extend(Polynomial(*remainder).evaluate_many(xs[i * size:(i + 1) * size]))
+
+    return result
+
+
+def interpolate(xs, ys):
+    """ Constructs a polynomial of the lowest power through given points with Newton's divided differences.
+
+        The points are taken in a Leja order, each next point is the farthest from the previous ones in the product
+        sense. This keeps the divided differences and their expansion to coefficients about as accurate as rounded
+        coefficients of the exact interpolant, with O(n^2) operations.
+    """
+
+    xs, ys = [float(x) for x in xs], [float(y) for y in ys]
+
+    assert len(xs) == len(ys) and len(xs) > 0
+
+    order = _leja_order(xs)
+    xs, values = [xs[i] for i in order], [ys[i] for i in order]
+    n = len(xs)
+
+    # Divided differences in place, values[k] becomes f[x_0, ..., x_k]
+    for k in xrange(1, n):
+        for i in xrange(n - 1, k - 1, -1):
+            values[i] = (values[i] - values[i - 1]) / (xs[i] - xs[i - k])
+
+    # Expand the Newton form from the innermost term, each step multiplies by (x - x_i) and adds a difference
+    coefficients = [values[-1]]
+
+    for i in xrange(n - 2, -1, -1):
+        coefficients = [a - xs[i] * b for a, b in zip(coefficients + [0.0], [0.0] + coefficients)]
+        coefficients[-1] += values[i]
+
+    return Polynomial(*coefficients)
+
+
+def _leja_order(xs):
+    """ Returns indices of points in a Leja order, starting from the point of the largest magnitude """
+
+    remaining = range(len(xs))
+    order = [max(remaining, key=lambda i: abs(xs[i]))]
+    remaining.remove(order[0])
+
+    # A sum of logarithms of distances to the chosen points, products of the distances quickly overflow
+    scores = [0.0] * len(xs)
+
+    while remaining:
+        last = xs[order[-1]]
+
+        for i in remaining:
+            distance = abs(xs[i] - last)
+            scores[i] += log(distance) if distance > 0.0 else float('-inf')
+
+        order.append(max(remaining, key=lambda i: scores[i]))
+        remaining.remove(order[-1])
+
+    return order
+
+
+def _subproduct_tree(xs):
+    """ Returns levels of a subproduct tree from the leaves (x - x_i) to the root, a product of all of them """
+
+    levels = [[[1.0, -float(x)] for x in xs]]
+
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        levels.append([convolve(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                       for i in xrange(0, len(level), 2)])
+
+    return levels
+
+
+def _coefficients(value):
+    """ Returns coefficients of a polynomial or of a constant or None for other types """
+
+    if isinstance(value, Polynomial):
+        return value.coefficients
+
+    if isinstance(value, Number):
+        return [float(value)]
+
+    return None
+
+
+def _add(a, b):
+    """ Returns a sum of two coefficient lists starting from the highest power """
+
+    if len(a) < len(b):
+        a, b = b, a
+
+    shift = len(a) - len(b)
+
+    return a[:shift] + [x + y for x, y in zip(a[shift:], b)]
+
+
+def _is_zero(coefficients, eps):
+    """ Returns true if all coefficients are not larger than eps """
+
+    return all(abs(v) <= eps for v in coefficients)
+
+
+def _divmod(a, b):
+    """ Divides coefficient lists starting from the highest power and returns a quotient and a remainder """
+
+    if not any(b):
+        raise ZeroDivisionError("Polynomial division by zero")
+
+    # Drop leading zeros of the divisor, so its first coefficient is the leading one
+    b = b[next(i for i, v in enumerate(b) if v):]
+    n, m = len(a), len(b)
+
+    if n < m:
+        return [0.0], list(a)
+
+    k = n - m + 1
+
+    if m > DIVISION_THRESHOLD and k > DIVISION_THRESHOLD:
+        # Read from the highest power, coefficient lists are the reversed polynomials, and a quotient of the
+        # reversed ones is a truncated power series product with a reciprocal of the reversed divisor
+        reciprocal = _reciprocal(b, k)
+
+        # The reciprocal series grows geometrically when the reversed divisor has roots inside the unit circle,
+        # its product then cancels catastrophically in floating point, so fall back to a long division
+        if all(abs(v * b[0]) < RECIPROCAL_GROWTH for v in reciprocal):
+            quotient = convolve(a[:k], reciprocal)[:k]
+            product = convolve(b, quotient)
+
+            return quotient, [x - y for x, y in zip(a[k:], product[k:])] or [0.0]
+
+    remainder = list(a)
+    quotient = []
+    lead = b[0]
+
+    for i in xrange(k):
+        c = remainder[i] / lead
+        quotient.append(c)
+
+        if c:
+            remainder[i:i + m] = [x - c * y for x, y in zip(remainder[i:i + m], b)]
+
+    return quotient, remainder[k:] or [0.0]
+
+
+def _reciprocal(series, k):
+    """ Returns first k coefficients of a reciprocal power series by a Newton's iteration """
+
+    result = [1.0 / series[0]]
+
+    while len(result) < k:
+        size = min(2 * len(result), k)
 
-        return operator
+        # g = g * (2 - f * g) doubles the number of correct coefficients
+        error = [-v for v in convolve(series[:size], result)[:size]]
+        error[0] += 2.0
+        result = convolve(result, error)[:size]
 
+    return result
@@ -0,0 +1,127 @@
+from collections import namedtuple
+
+from polynomial import Polynomial
+
+
+# Per starting point outcome of a Newton's iteration
+RootReport = namedtuple('RootReport', ['start', 'root', 'status', 'iterations', 'residual'])
+
+CONVERGED = 'converged'
+DIVERGED = 'diverged'
+ZERO_DERIVATIVE = 'zero derivative'
+MAX_ITERATIONS = 'max iterations'
+
+
+def newton_many(f, starts, eps=1e-10, max_iterations=100, divergence=1e12):
+    """ Advances a Newton's iteration from many starting points at once and reports each of them """
+
+    assert isinstance(f, Polynomial)
+
+    df_dx = f.derivative
+    xs = list(starts)
+    status = [MAX_ITERATIONS] * len(xs)
+    iterations = [0] * len(xs)
+    residuals = [None] * len(xs)
+    active = range(len(xs))
+
+    for iteration in range(max_iterations + 1):
+        if not active:
+            break
+
+        points = [xs[i] for i in active]
+        ys = f.evaluate_many(points)
+        slopes = df_dx.evaluate_many(points)
+        still_active = []
+
+        for i, x, y, slope in zip(active, points, ys, slopes):
+            residuals[i] = abs(y)
+            iterations[i] = iteration
+
+            if abs(y) <= eps:
+                status[i] = CONVERGED
+            elif abs(x) > divergence:
+                status[i] = DIVERGED
+            elif slope == 0:
+                status[i] = ZERO_DERIVATIVE
+            elif iteration < max_iterations:
+                xs[i] = x - y / slope
+                still_active.append(i)
+
+        active = still_active
+
+    return [RootReport(s, x, st, n, r) for s, x, st, n, r in zip(starts, xs, status, iterations, residuals)]
+
+
+def find_roots(f, eps=1e-10, max_iterations=100, start=complex(0.4, 0.9)):
+    """ Finds all, possibly complex, roots of a polynomial by a Newton's method with deflation """
+
+    assert isinstance(f, Polynomial)
+
+    original = f.coefficients
+    coefficients = list(original)
+    result = []
+
+    while len(coefficients) > 1:
+        if len(coefficients) == 2:
+            root, status, iterations = -coefficients[1] / coefficients[0], CONVERGED, 0
+        else:
+            root, status, iterations = _newton(coefficients, start, eps, max_iterations)
+
+        # Polish the root on the original polynomial to remove an error accumulated by deflation
+        root, polish_status, polish_iterations = _newton(original, root, eps, max_iterations)
+
+        if status == CONVERGED:
+            status = polish_status
+
+        if abs(root.imag) <= eps * max(1.0, abs(root.real)):
+            root = root.real
+
+        result.append(RootReport(start, root, status, iterations + polish_iterations,
+                                 abs(_horner(original, root)[0])))
+
+        coefficients = _deflate(coefficients, root)
+
+    return result
+
+
+def _horner(coefficients, x):
+    """ Evaluates a polynomial and its derivative at a given point in a single pass """
+
+    value, slope = 0.0, 0.0
+
+    for v in coefficients:
+        slope = slope * x + value
+        value = value * x + v
+
+    return value, slope
+
+
+def _newton(coefficients, x, eps, max_iterations):
+    """ Runs a Newton's iteration for a polynomial given by a list of coefficients """
+
+    x = complex(x)
+
+    for iteration in range(max_iterations + 1):
+        value, slope = _horner(coefficients, x)
+
+        if abs(value) <= eps:
+            return x, CONVERGED, iteration
+
+        if slope == 0:
+            return x, ZERO_DERIVATIVE, iteration
+
+        if iteration < max_iterations:
+            x -= value / slope
+
+    return x, MAX_ITERATIONS, max_iterations
+
+
+def _deflate(coefficients, root):
+    """ Divides a polynomial by (x - root) with a synthetic division and drops the remainder """
+
+    result = [coefficients[0]]
+
+    for v in coefficients[1:-1]:
+        result.append(v + result[-1] * root)
+
+    return result
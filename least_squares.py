@@ -1,8 +1,9 @@
-import gauss
-import vector
-import matrix
+from math import hypot, sqrt
 
-#A = gauss.read_matrix()
+from linear import Matrix
+from linear import Vector
+
+#A = Matrix.read_from_input()
 A = [
     [4, 2, 8],
     [5, 2, 4],
@@ -11,26 +12,121 @@ A = [
 ]
 
 
-def solve(input_system):
-    columns = matrix.columns(input_system)
+class LeastSquares(object):
+    """ Streaming least squares solver that keeps an incrementally updated QR factor of the observations """
+
+    def __init__(self, parameters, tolerance=1e-10):
+        """ Constructs a solver for a given number of unknowns, memory stays O(parameters^2) """
+
+        self._r = [[0.0] * parameters for i in range(parameters)]
+        self._qtb = [0.0] * parameters
+        self._rss = 0.0
+        self._count = 0
+        self._tolerance = tolerance
+
+    def add(self, x, y):
+        """ Adds a single observation, a row x of the design matrix and a right hand side value y """
+
+        x = [float(v) for v in x]
+        y = float(y)
+        n = len(self._qtb)
+
+        assert len(x) == n
+
+        # Rotate the new row into R with Givens rotations, one per non-zero entry
+        for k in range(0, n):
+            if x[k] == 0.0:
+                continue
+
+            row = self._r[k]
+            h = hypot(row[k], x[k])
+            c, s = row[k] / h, x[k] / h
+
+            for j in range(k, n):
+                row[j], x[j] = c * row[j] + s * x[j], c * x[j] - s * row[j]
+
+            self._qtb[k], y = c * self._qtb[k] + s * y, c * y - s * self._qtb[k]
+
+        # Whatever is left of the right hand side is orthogonal to the column space
+        self._rss += y * y
+        self._count += 1
+
+    def add_rows(self, observations):
+        """ Adds (x, y) observations from any iterable, for example a generator """
+
+        for x, y in observations:
+            self.add(x, y)
+
+    def add_chunk(self, design, rhs):
+        """ Adds a chunk of observations given as a design matrix and a right hand side vector """
+
+        assert design.rows == len(rhs)
 
-    f = columns[-1]
-    subspace = columns[:-1]
+        for i, row in enumerate(design):
+            self.add(row.values(), rhs[i])
 
-    system = []
+    @property
+    def coefficients(self):
+        """ Returns the least squares coefficients, unknowns of dependent columns are set to zero """
 
-    for i, e in enumerate(subspace):
-        assert len(f) == len(e)
+        n = len(self._qtb)
+        result = [0.0] * n
+        threshold = self._threshold
 
-        equation = []
+        for i in range(n - 1, -1, -1):
+            row = self._r[i]
 
-        for j, s in enumerate(subspace):
-            equation.append(vector.dot(e, s))
+            if abs(row[i]) <= threshold:
+                continue
+
+            result[i] = (self._qtb[i] - sum(row[j] * result[j] for j in range(i + 1, n))) / row[i]
+
+        return Vector(result)
+
+    @property
+    def residual(self):
+        """ Returns the norm of the residual vector of all observations seen so far """
+
+        threshold = self._threshold
+        dropped = sum(self._qtb[i] ** 2 for i in range(len(self._qtb)) if abs(self._r[i][i]) <= threshold)
+
+        return sqrt(self._rss + dropped)
+
+    @property
+    def rank(self):
+        """ Returns a numerical rank of the design matrix """
+
+        threshold = self._threshold
+        return len([i for i in range(len(self._qtb)) if abs(self._r[i][i]) > threshold])
+
+    @property
+    def r(self):
+        """ Returns the upper triangular factor R """
+
+        return Matrix.from_rows(self._r)
+
+    @property
+    def count(self):
+        """ Returns a total number of observations seen so far """
+
+        return self._count
+
+    @property
+    def _threshold(self):
+        """ Returns a magnitude below which diagonal entries of R are treated as zero, relative to the largest one """
+
+        largest = max([abs(self._r[i][i]) for i in range(len(self._qtb))] + [0.0])
+        return self._tolerance * largest
+
+
+def solve(input_system):
+    """ Solves a system given as rows of an augmented matrix in a least squares sense """
 
-        equation.append(vector.dot(e, f))
+    solver = LeastSquares(len(input_system[0]) - 1)
+    solver.add_rows((row[:-1], row[-1]) for row in input_system)
 
-        system.append(equation)
+    return solver.coefficients
 
-    gauss.solve(system)
 
-print solve(A)
+if __name__ == '__main__':
+    print solve(A)
@@ -1,3 +1,6 @@
 from vector import Vector
 from matrix import Matrix
 from row_echelon import RRef
+from lu import LU
+from sparse import SparseMatrix
+from expression import lazy
@@ -1,5 +1,17 @@
+from operator import mul
+
+import instrumentation
+import qr
+import row_echelon
 from matrix import Matrix
 from vector import Vector
+from sparse import SparseMatrix, sparse_gauss_elimination, sparse_null_space
+
+
+# Pivoting strategies of a Gauss elimination
+PARTIAL = 'partial'
+FULL = 'full'
+ROOK = 'rook'
 
 
 def is_close(a, b, rel_tol=1e-09, abs_tol=1e-09):
@@ -10,7 +22,7 @@ def is_close(a, b, rel_tol=1e-09, abs_tol=1e-09):
 def transposed(matrix):
     """ Returns a transpose of this matrix """
 
-    result = Matrix(matrix.cols, matrix.rows)
+    result = Matrix(matrix.cols, matrix.rows, matrix.element)
 
     for i in range(0, result.rows):
         result[i] = matrix.column(i)
@@ -21,47 +33,40 @@ def transposed(matrix):
 def column_space(matrix):
     """ Returns a column space for a given matrix """
 
-    r_ref, pivots, free_columns = gauss_elimination(matrix)
-
-    vectors = []
-    for row, column in pivots:
-        vectors.append(matrix.column(column).items)
-
-    return transposed(Matrix.from_rows(vectors))
+    return row_echelon.RRef(matrix).column_space
 
 
 def null_space(matrix):
     """ Returns a null space of an input matrix """
 
-    # Perform Gauss elimination
-    r_ref, pivots, free_columns = gauss_elimination(matrix)
-
-    result = Matrix(matrix.cols, len(free_columns))
+    if isinstance(matrix, SparseMatrix):
+        return sparse_null_space(matrix)
 
-    for pivot_row, pivot_column in pivots:
-        for j, free in enumerate(free_columns):
-            result[pivot_column][j] = -matrix[pivot_row][free]
-
-    for i, column in enumerate(free_columns):
-        result[column][i] = 1.0
-
-    return result
+    return row_echelon.RRef(matrix).null_space
 
 
 def gauss_elimination(matrix):
     """ Takes an input matrix and returns it in reduced row echelon form """
 
-    # Make a deep copy of an input matrix
-    r_ref = matrix.copy()
+    if isinstance(matrix, SparseMatrix):
+        return sparse_gauss_elimination(matrix)
 
-    # Convert to a reduced row echelon form
-    pivots, free = inplace_gauss_elimination(r_ref)
+    r_ref = row_echelon.RRef(matrix)
 
-    return r_ref, pivots, free
+    return r_ref.matrix, r_ref.pivots, r_ref.free_columns
 
 
 def det(matrix):
-    """ Calculates a determinant of an input matrix """
+    """ Calculates a determinant of an input matrix, exact matrices use a fraction-free elimination """
+
+    if matrix.is_exact:
+        triangular, sign, rank = bareiss(matrix)
+        n = triangular.diagonal_size
+
+        if rank < n:
+            return 0
+
+        return sign * triangular[n - 1][n - 1] if n > 0 else 1
 
     triangular, sign = upper_triangular(matrix)
     result = 1.0
@@ -75,79 +80,257 @@ def det(matrix):
 def upper_triangular(matrix):
     """ Returns an upper triangular for of an input matrix """
 
-    # Make a deep copy of an input matrix
-    return inplace_upper_triangular(matrix.copy())
+    # Make a deep copy of an input matrix, exact ones are converted to fractions to keep divisions exact
+    return inplace_upper_triangular(matrix.copy(matrix.element if matrix.is_exact else None))
+
+
+def rank(matrix):
+    """ Returns a rank of an input matrix, exact matrices use a fraction-free elimination """
+
+    if matrix.is_exact:
+        return bareiss(matrix)[2]
+
+    return row_echelon.RRef(matrix).rank
+
+
+def bareiss(matrix):
+    """ Runs a Bareiss fraction-free elimination on a copy of an exact matrix.
+
+        Returns a row echelon form, a sign of the row permutation and a rank. Every entry stays a minor of
+        the input, so integer matrices stay integer and the entries do not grow beyond the determinant size.
+    """
+
+    rows = [list(row.values()) for row in matrix]
+    sign = 1
+    previous = 1
+    r = 0
+
+    for c in range(0, matrix.cols):
+        if r == matrix.rows:
+            break
+
+        pivot = next((i for i in range(r, matrix.rows) if rows[i][c] != 0), None)
+
+        if pivot is None:
+            continue
+
+        if pivot != r:
+            rows[r], rows[pivot] = rows[pivot], rows[r]
+            sign = -sign
+
+        pivot_row = rows[r]
+        coefficient = pivot_row[c]
+
+        for i in range(r + 1, matrix.rows):
+            row = rows[i]
+            factor = row[c]
+
+            for j in range(c + 1, matrix.cols):
+                row[j] = _exact_divide(row[j] * coefficient - factor * pivot_row[j], previous)
+
+            row[c] = 0
+
+        previous = coefficient
+        r += 1
+
+    return Matrix.from_buffer([v for row in rows for v in row], matrix.rows, matrix.cols), sign, r
+
 
+def _exact_divide(a, b):
+    """ Divides two values that are known to divide exactly """
 
-def inplace_upper_triangular(matrix):
+    if isinstance(a, (int, long)) and isinstance(b, (int, long)):
+        return a // b
+
+    return a / b
+
+
+def inplace_upper_triangular(matrix, lower=None, permutation=None, pivoting=PARTIAL, column_permutation=None):
     """ Converts an input matrix to a upper triangular one by running Gauss elimination on it """
 
-    sign = 1.0
+    sign = 1
+    report = instrumentation.active
+
+    with instrumentation.phase('forward elimination'):
+        for step in range(0, matrix.diagonal_size):
+            pivot = find_pivot(matrix, step, range(step, matrix.cols) if pivoting != PARTIAL else [step], pivoting)
+
+            if pivot is None:
+                continue
 
-    for step in range(0, matrix.diagonal_size):
-        coefficient = matrix[step][step]
+            pivot, column = pivot
 
-        if is_close(coefficient, 0.0):
-            for i in range(step, matrix.diagonal_size):
-                if matrix[i][step] != 0.0:
-                    matrix.swap_rows(step, i)
-                    sign *= -1
-                    break
+            if pivot != step:
+                matrix.swap_rows(step, pivot)
+                sign *= -1
+
+                # Keep the recorded multipliers and the row permutation in sync with the exchange
+                if lower is not None:
+                    lower.swap_rows(step, pivot)
+
+                if permutation is not None:
+                    permutation[step], permutation[pivot] = permutation[pivot], permutation[step]
+
+            if column != step:
+                matrix.swap_columns(step, column)
+                sign *= -1
+
+                if column_permutation is not None:
+                    column_permutation[step], column_permutation[column] = \
+                        column_permutation[column], column_permutation[step]
 
             coefficient = matrix[step][step]
+            pivot_row = matrix[step]
 
-        if is_close(coefficient, 0.0):
-            continue
+            for idx in range(step + 1, matrix.rows):
+                row = matrix[idx]
+                factor = row[step] / coefficient
+                row.axpy(-factor, pivot_row, step + 1)
+                row[step] = 0
 
-        for idx in range(step + 1, matrix.rows):
-            matrix[idx] -= matrix[step] * (matrix[idx][step] / coefficient)
+                if lower is not None:
+                    lower[idx][step] = factor
+
+            if report is not None:
+                count = matrix.rows - step - 1
+                report.row_operations += count
+                report.flops += count * (2 * (matrix.cols - step - 1) + 1)
 
     return matrix, sign
 
 
-def inplace_gauss_elimination(r_ref):
-    """ Converts the input matrix to a reduced row echelon form """
+def find_pivot(matrix, start, columns, pivoting=PARTIAL, tolerance=None):
+    """ Returns a (row, column) position of a pivot among rows from start and given columns or None if all are zero
 
-    # Perform a first pass of Gauss elimination process
+        Partial pivoting takes the largest entry of the first non-zero column, full pivoting takes the largest
+        entry overall and rook pivoting walks to an entry that is the largest both in its row and its column.
+    """
 
-    for step in range(0, r_ref.diagonal_size):
-        r_ref.sort_rows(lambda matrix_row: -abs(matrix_row[step]), start_from=step)
+    def largest_in_column(c):
+        values = matrix.column(c).values()
+        return max(xrange(start, matrix.rows), key=lambda i: abs(values[i]))
 
-        coefficient = r_ref[step][step]
+    def largest_in_row(r):
+        values = matrix[r].values()
+        return max(columns, key=lambda j: abs(values[j]))
 
-        if is_close(coefficient, 0.0):
-            continue
+    if start >= matrix.rows or not columns:
+        return None
 
-        for idx in range(step + 1, r_ref.rows):
-            r_ref[idx] -= r_ref[step] * (r_ref[idx][step] / coefficient)
+    if tolerance is None:
+        tolerance = 0 if matrix.is_exact else 1e-09
 
-    # Convert all values that are near the zero to zero
-    r_ref.zero_small_values()
+    if pivoting == FULL:
+        row = max(xrange(start, matrix.rows), key=lambda i: abs(matrix[i][largest_in_row(i)]))
+        column = largest_in_row(row)
 
-    # Get the pivot and free entries
-    pivots = [(i, row.pivot_index) for i, row in enumerate(r_ref) if row.pivot_index is not None]
-    free = [i for i in range(0, r_ref.cols) if i not in [i for i, c in pivots]]
+        return (row, column) if abs(matrix[row][column]) > tolerance else None
 
-    # Now convert a row echelon matrix to a reduced row echelon form
+    for column in columns:
+        row = largest_in_column(column)
 
-    for pivot_row, pivot_column in pivots:
-        for row in range(pivot_row - 1, -1, -1):
-            r_ref[row] -= r_ref[pivot_row] * (r_ref[row][pivot_column] / r_ref[pivot_row][pivot_column])
+        if abs(matrix[row][column]) > tolerance:
+            break
+    else:
+        return None
+
+    if pivoting == ROOK:
+        while True:
+            best = largest_in_row(row)
 
-    # Finally, normalize each row by a leading coefficient
+            if abs(matrix[row][best]) <= abs(matrix[row][column]):
+                break
 
-    for i, row in enumerate(r_ref):
-        leading = None
+            column = best
+            best = largest_in_column(column)
 
-        for j in range(i, r_ref.cols):
-            if row[j] != 0:
-                leading = row[j]
+            if abs(matrix[best][column]) <= abs(matrix[row][column]):
                 break
 
-        if leading is None:
-            break
+            row = best
+
+    return row, column
+
+
+def inplace_gauss_elimination(r_ref, columns=None, pivoting=PARTIAL, permutation=None):
+    """ Converts the input matrix to a reduced row echelon form, pivots are searched in the first columns only
+
+        With full or rook pivoting, pivot columns are chosen by magnitude, so the result is reduced, each pivot
+        column being a unit vector, but pivot columns need not be the leftmost ones.
+    """
+
+    if columns is None:
+        columns = r_ref.cols
+
+    # Perform a first pass of Gauss elimination process
+
+    candidates = range(0, columns)
+    pivots = []
+    report = instrumentation.active
+
+    with instrumentation.phase('forward elimination'):
+        for step in range(0, r_ref.rows):
+            pivot = find_pivot(r_ref, step, candidates, pivoting)
+
+            if pivot is None:
+                break
+
+            pivot, column = pivot
+
+            if pivot != step:
+                r_ref.swap_rows(step, pivot)
+
+                if permutation is not None:
+                    permutation[step], permutation[pivot] = permutation[pivot], permutation[step]
+
+            # Entries of the remaining rows are zero in every column before the first candidate one
+            start = candidates[0]
+            candidates.remove(column)
+            pivots.append((step, column))
 
-        r_ref[i] /= leading
+            pivot_row = r_ref[step]
+            coefficient = pivot_row[column]
+
+            for idx in range(step + 1, r_ref.rows):
+                row = r_ref[idx]
+                row.axpy(-(row[column] / coefficient), pivot_row, start)
+                row[column] = 0
+
+            if report is not None:
+                count = r_ref.rows - step - 1
+                report.row_operations += count
+                report.flops += count * (2 * (r_ref.cols - start) + 1)
+
+        # Convert all values that are near the zero to zero
+        r_ref.zero_small_values()
+
+    # Now convert a row echelon matrix to a reduced row echelon form, normalizing each row by its pivot first,
+    # so that entries of the pivot columns above each pivot are then eliminated by unit pivots
+
+    with instrumentation.phase('normalization'):
+        for pivot_row, pivot_column in pivots:
+            pivot = r_ref[pivot_row]
+            pivot /= pivot[pivot_column]
+            pivot[pivot_column] = 1
+
+        if report is not None:
+            report.row_operations += len(pivots)
+            report.flops += len(pivots) * r_ref.cols
+
+    with instrumentation.phase('back substitution'):
+        for pivot_row, pivot_column in reversed(pivots):
+            pivot = r_ref[pivot_row]
+            start = pivot_column if pivoting == PARTIAL else 0
+
+            for row in range(pivot_row - 1, -1, -1):
+                r_ref[row].axpy(-r_ref[row][pivot_column], pivot, start)
+                r_ref[row][pivot_column] = 0
+
+            if report is not None:
+                report.row_operations += pivot_row
+                report.flops += pivot_row * 2 * (r_ref.cols - start)
+
+    free = [j for j in range(0, columns) if j in candidates]
 
     return pivots, free
 
@@ -162,7 +345,7 @@ def linear_combination(basis, scalars):
         assert isinstance(e, Vector)
 
     # Create an instance of a resulting vector
-    result = Vector([0.0] * basis[0].dim)
+    result = Vector([0] * basis[0].dim, element=basis[0].element)
 
     # Combine basis vectors
     for i, s in enumerate(scalars):
@@ -174,17 +357,34 @@ def linear_combination(basis, scalars):
 def bilinear(matrix, a, b):
     """ Calculates a bilinear form value for two given vectors """
 
-    result = Matrix.from_row_vectors([a]) * matrix * Matrix.from_column_vectors([b])
+    assert matrix.rows == a.dim and matrix.cols == b.dim
 
-    return result[0][0]
+    b = b.values()
+    return sum(x * sum(map(mul, row.values(), b)) for x, row in zip(a, matrix))
 
 
 def quadratic(matrix, vector):
     """ Calculates a quadratic form value for a given vector """
 
-    result = Matrix.from_row_vectors([vector]) * matrix * Matrix.from_column_vectors([vector])
+    return bilinear(matrix, vector, vector)
+
 
-    return result[0][0]
+def quadratic_many(matrix, vectors):
+    """ Calculates quadratic form values for a batch of vectors """
+
+    assert matrix.rows == matrix.cols
+
+    # Pack the matrix rows once for all vectors
+    rows = [row.values() for row in matrix]
+    result = []
+
+    for vector in vectors:
+        assert vector.dim == matrix.cols
+
+        x = vector.values()
+        result.append(sum(a * sum(map(mul, row, x)) for a, row in zip(x, rows)))
+
+    return result
 
 
 def is_orthagonal(basis):
@@ -204,31 +404,24 @@ def is_orthagonal(basis):
 def is_basis(vectors):
     """ Returns true if a given set of vectors is linearly independent """
 
-    c = column_space(Matrix.from_columns([v.items for v in vectors]))
-    return c.dimensions[1] == len(vectors)
-
-
-def gram_schmidt(basis, normalize=True):
-    """ Performs a Gram-Schmidt orthogonalization process on a set of vectors """
+    return row_echelon.RRef(Matrix.from_column_vectors(vectors)).rank == len(vectors)
 
-    assert is_basis(basis)
-
-    result = []
 
-    for i in range(0, len(basis)):
-        e = basis[i]
+def gram_schmidt(basis, normalize=True, check=False):
+    """ Performs a modified Gram-Schmidt orthogonalization process on a set of vectors.
 
-        # Calculate scalars for each existing basis vector
-        s = [-v.project(e)[1] for v in result]
+        Dependent vectors are detected from the diagonal of R for free, an orthogonality check is opt-in.
+    """
 
-        # Next basis vector is a linear combination of previously calculated
-        n = linear_combination([e] + result, [1.0] + s)
+    q, r = qr.qr(Matrix.from_column_vectors(basis), qr.MGS)
 
-        result.append(n)
+    # A dependent vector leaves a zero column of Q and a zero on the diagonal of R
+    assert q.cols == len(basis) and all(r[i][i] != 0.0 for i in range(0, q.cols)), "Vectors are not a basis"
 
-    if normalize:
-        result = [n.normalized() for n in result]
+    # Columns of Q are normalized, scaling by the diagonal of R restores the plain Gram-Schmidt lengths
+    result = [q.column(i).copy() if normalize else q.column(i) * r[i][i] for i in range(0, q.cols)]
 
-    assert is_orthagonal(result)
+    if check:
+        assert is_orthagonal(result)
 
     return result
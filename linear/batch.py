@@ -0,0 +1,109 @@
+import multiprocessing
+from multiprocessing.sharedctypes import RawArray
+
+import storage
+from matrix import Matrix
+from algorithms import det, gauss_elimination, inplace_gauss_elimination
+
+
+# Shared input and output buffers of a worker process, set by a pool initializer
+_source = None
+_target = None
+
+
+def det_many(matrices, processes=None, chunksize=None):
+    """ Calculates determinants of a batch of matrices in a pool of processes """
+
+    # Shared buffers hold floats only, exact matrices are reduced serially to keep their results exact
+    if processes == 1 or len(matrices) < 2 or any(m.is_exact for m in matrices):
+        return [det(m) for m in matrices]
+
+    source, tasks = _pack(matrices)
+    return _run(_det_task, tasks, source, None, processes, chunksize)
+
+
+def rref_many(matrices, processes=None, chunksize=None):
+    """ Converts a batch of matrices to a reduced row echelon form in a pool of processes.
+
+        Returns a list of (r_ref, pivots, free) tuples, the same as gauss_elimination does.
+    """
+
+    if processes == 1 or len(matrices) < 2 or any(m.is_exact for m in matrices):
+        return [gauss_elimination(m) for m in matrices]
+
+    source, tasks = _pack(matrices)
+    target = RawArray('d', len(source))
+    pivots = _run(_rref_task, tasks, source, target, processes, chunksize)
+
+    result = []
+
+    for (offset, rows, cols), (p, free) in zip(tasks, pivots):
+        r_ref = Matrix.from_buffer(storage.from_values(target[offset:offset + rows * cols]), rows, cols)
+        result.append((r_ref, p, free))
+
+    return result
+
+
+def _pack(matrices):
+    """ Copies a batch of matrices to a single shared buffer and returns it with (offset, rows, cols) tasks """
+
+    tasks = []
+    offset = 0
+
+    for m in matrices:
+        tasks.append((offset, m.rows, m.cols))
+        offset += m.rows * m.cols
+
+    source = RawArray('d', offset)
+
+    for (offset, rows, cols), m in zip(tasks, matrices):
+        source[offset:offset + rows * cols] = m.values()
+
+    return source, tasks
+
+
+def _run(task, tasks, source, target, processes, chunksize):
+    """ Maps a task over a pool of processes sharing the input and output buffers """
+
+    processes = processes or multiprocessing.cpu_count()
+
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (4 * processes))
+
+    pool = multiprocessing.Pool(processes, initializer=_initialize, initargs=(source, target))
+
+    try:
+        return pool.map(task, tasks, chunksize)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _initialize(source, target):
+    """ Stores the shared buffers in a worker process """
+
+    global _source, _target
+    _source, _target = source, target
+
+
+def _load(offset, rows, cols):
+    """ Constructs a private copy of a matrix stored in the shared input buffer """
+
+    return Matrix.from_buffer(storage.from_values(_source[offset:offset + rows * cols]), rows, cols)
+
+
+def _det_task(task):
+    """ Calculates a determinant of a matrix stored in the shared input buffer """
+
+    return det(_load(*task))
+
+
+def _rref_task(task):
+    """ Reduces a matrix from the shared input buffer and writes it to the shared output buffer """
+
+    offset, rows, cols = task
+    r_ref = _load(offset, rows, cols)
+    pivots, free = inplace_gauss_elimination(r_ref)
+    _target[offset:offset + rows * cols] = r_ref.values()
+
+    return pivots, free
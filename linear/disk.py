@@ -0,0 +1,157 @@
+import os
+import sys
+import mmap
+import ctypes
+import struct
+
+import storage
+
+
+# Binary matrix file layout: a fixed size header followed by a raw row-major float64 payload
+MAGIC = 'LMAT'
+VERSION = 1
+FLOAT64 = 1
+HEADER = struct.Struct('<4sBBBxQQ')
+HEADER_SIZE = 32
+LITTLE_ENDIAN, BIG_ENDIAN = 0, 1
+
+
+class DiskFormatError(Exception):
+    """ An exception class for malformed matrix files """
+    pass
+
+
+def write_header(f, rows, cols):
+    """ Writes a matrix file header """
+
+    byteorder = LITTLE_ENDIAN if sys.byteorder == 'little' else BIG_ENDIAN
+    header = HEADER.pack(MAGIC, VERSION, FLOAT64, byteorder, rows, cols)
+    f.write(header + '\0' * (HEADER_SIZE - len(header)))
+
+
+def read_header(f):
+    """ Reads a matrix file header and returns the matrix dimensions """
+
+    raw = f.read(HEADER_SIZE)
+
+    if len(raw) != HEADER_SIZE:
+        raise DiskFormatError("Truncated matrix header")
+
+    magic, version, dtype, byteorder, rows, cols = HEADER.unpack(raw[:HEADER.size])
+
+    if magic != MAGIC or version != VERSION:
+        raise DiskFormatError("Not a matrix file")
+
+    if dtype != FLOAT64:
+        raise DiskFormatError("Unsupported element type: " + str(dtype))
+
+    if byteorder != (LITTLE_ENDIAN if sys.byteorder == 'little' else BIG_ENDIAN):
+        raise DiskFormatError("Matrix file byte order does not match this machine")
+
+    return rows, cols
+
+
+def write(path, rows, cols, values):
+    """ Writes a matrix given by its row-major values to a file """
+
+    with open(path, 'wb') as f:
+        write_header(f, rows, cols)
+        f.write(storage.compatible(storage.allocate(0), values).tostring())
+
+
+def create(path, rows, cols):
+    """ Creates a zero filled matrix file of given dimensions without writing the payload """
+
+    with open(path, 'wb') as f:
+        write_header(f, rows, cols)
+        f.truncate(HEADER_SIZE + rows * cols * storage.ITEMSIZE)
+
+
+def map_file(path, writable=True):
+    """ Memory-maps a matrix file and returns a (buffer, rows, cols) tuple.
+
+        A read-only mapping is copy-on-write, so writes to it stay private to this process.
+    """
+
+    with open(path, 'r+b' if writable else 'rb') as f:
+        rows, cols = read_header(f)
+        size = HEADER_SIZE + rows * cols * storage.ITEMSIZE
+
+        if os.fstat(f.fileno()).st_size < size:
+            raise DiskFormatError("Truncated matrix payload")
+
+        mapping = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_COPY)
+
+    # The ctypes array keeps a reference to the mapping, so it stays open as long as the buffer is alive
+    return (ctypes.c_double * (rows * cols)).from_buffer(mapping, HEADER_SIZE), rows, cols
+
+
+def read_text(path, delimiter=None):
+    """ Reads a whitespace or delimiter separated text matrix and returns a (buffer, rows, cols) tuple """
+
+    data = storage.allocate(0)
+    rows, cols = 0, None
+
+    for chunk in _text_chunks(path, delimiter):
+        values, n, width = chunk
+        cols = _check_width(cols, width)
+        data.extend(values)
+        rows += n
+
+    return data, rows, cols or 0
+
+
+def convert_text(source, target, delimiter=None):
+    """ Streams a text matrix to a binary matrix file chunk by chunk and returns its dimensions """
+
+    rows, cols = 0, None
+
+    with open(target, 'wb') as f:
+        write_header(f, 0, 0)
+
+        for values, n, width in _text_chunks(source, delimiter):
+            cols = _check_width(cols, width)
+            f.write(values.tostring())
+            rows += n
+
+        f.seek(0)
+        write_header(f, rows, cols or 0)
+
+    return rows, cols or 0
+
+
+def _check_width(cols, width):
+    """ Checks that all chunks of a text matrix have the same number of columns """
+
+    if cols is not None and width != cols:
+        raise DiskFormatError("Rows of a text matrix have different lengths")
+
+    return width
+
+
+def _text_chunks(path, delimiter, chunk_lines=65536):
+    """ Parses a text matrix in chunks of lines, each split and converted in bulk """
+
+    with open(path) as f:
+        while True:
+            chunk = f.readlines(chunk_lines * 64)
+
+            if not chunk:
+                break
+
+            if delimiter is not None:
+                chunk = [line.replace(delimiter, ' ') for line in chunk]
+
+            rows = [fields for fields in (line.split() for line in chunk) if fields]
+
+            if not rows:
+                continue
+
+            width = len(rows[0])
+
+            if any(len(fields) != width for fields in rows):
+                raise DiskFormatError("Rows of a text matrix have different lengths")
+
+            values = storage.from_values(map(float, [v for fields in rows for v in fields]))
+
+            yield values, len(rows), width
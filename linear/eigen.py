@@ -0,0 +1,99 @@
+from math import sqrt
+
+from matrix import Matrix, MatrixError
+
+
+POSITIVE_DEFINITE = 'positive definite'
+POSITIVE_SEMIDEFINITE = 'positive semidefinite'
+NEGATIVE_DEFINITE = 'negative definite'
+NEGATIVE_SEMIDEFINITE = 'negative semidefinite'
+INDEFINITE = 'indefinite'
+
+
+def symmetric_eigen(matrix, tolerance=1e-12, max_sweeps=100):
+    """ Computes eigenvalues and eigenvectors of a symmetric matrix with a cyclic Jacobi method.
+
+        Returns a list of eigenvalues in ascending order and a matrix with the matching unit eigenvectors
+        as columns, so that A = V * diag(eigenvalues) * V^T.
+    """
+
+    if matrix.rows != matrix.cols:
+        raise MatrixError("Eigen decomposition requires a square matrix")
+
+    n = matrix.rows
+    a = [list(row.values()) for row in matrix]
+    v = [[1.0 if i == j else 0.0 for j in range(n)] for i in range(n)]
+    scale = sum(x * x for row in a for x in row)
+
+    for sweep in range(max_sweeps):
+        off = sum(a[i][j] * a[i][j] for i in range(n) for j in range(i + 1, n))
+
+        if off <= tolerance * tolerance * scale:
+            break
+
+        for p in range(n - 1):
+            for q in range(p + 1, n):
+                if a[p][q] == 0.0:
+                    continue
+
+                # Rotation angle that annihilates a[p][q]
+                theta = (a[q][q] - a[p][p]) / (2.0 * a[p][q])
+                t = (1.0 if theta >= 0.0 else -1.0) / (abs(theta) + sqrt(theta * theta + 1.0))
+                c = 1.0 / sqrt(t * t + 1.0)
+                s = t * c
+
+                for row in a:
+                    row[p], row[q] = c * row[p] - s * row[q], s * row[p] + c * row[q]
+
+                a[p], a[q] = [c * x - s * y for x, y in zip(a[p], a[q])], [s * x + c * y for x, y in zip(a[p], a[q])]
+
+                for row in v:
+                    row[p], row[q] = c * row[p] - s * row[q], s * row[p] + c * row[q]
+
+    order = sorted(range(n), key=lambda i: a[i][i])
+    vectors = Matrix.from_rows([[row[i] for i in order] for row in v]) if n else Matrix(0, 0)
+
+    return [a[i][i] for i in order], vectors
+
+
+def definiteness(matrix, tolerance=1e-10):
+    """ Classifies a symmetric matrix, or a quadratic form it defines, by the signs of its eigenvalues """
+
+    eigenvalues, vectors = symmetric_eigen(matrix)
+    threshold = tolerance * max([abs(e) for e in eigenvalues] + [1.0])
+
+    positive = any(e > threshold for e in eigenvalues)
+    negative = any(e < -threshold for e in eigenvalues)
+    singular = any(abs(e) <= threshold for e in eigenvalues)
+
+    if positive and negative:
+        return INDEFINITE
+
+    if positive:
+        return POSITIVE_SEMIDEFINITE if singular else POSITIVE_DEFINITE
+
+    if negative:
+        return NEGATIVE_SEMIDEFINITE if singular else NEGATIVE_DEFINITE
+
+    return POSITIVE_SEMIDEFINITE
+
+
+def is_positive_definite(matrix):
+    """ Returns true if a symmetric matrix is positive definite, a Cholesky factorization stops on a first failure """
+
+    n = matrix.rows
+    a = [list(row.values()) for row in matrix]
+    lower = [[0.0] * n for i in range(n)]
+
+    for j in range(n):
+        d = a[j][j] - sum(x * x for x in lower[j][:j])
+
+        if d <= 0.0:
+            return False
+
+        lower[j][j] = sqrt(d)
+
+        for i in range(j + 1, n):
+            lower[i][j] = (a[i][j] - sum(x * y for x, y in zip(lower[i][:j], lower[j][:j]))) / lower[j][j]
+
+    return True
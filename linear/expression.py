@@ -0,0 +1,356 @@
+from numbers import Number
+
+import storage
+from matrix import Matrix, MatrixError
+from vector import Vector
+
+
+# Kinds of expression values, vectors are columns unless transposed
+MATRIX = 'matrix'
+COLUMN = 'column'
+ROW = 'row'
+SCALAR = 'scalar'
+
+
+def lazy(value):
+    """ Wraps a matrix or a vector into an expression, operators on it build a tree evaluated on demand """
+
+    if isinstance(value, Expression):
+        return value
+
+    if isinstance(value, (Matrix, Vector)):
+        return Operand(value)
+
+    raise TypeError("Only matrices and vectors can be lazy operands")
+
+
+class Expression(object):
+    """ A node of a lazy expression tree of matrix and vector operations.
+
+        Trees are kept normalized while they are built: transposes are pushed down to operands, where they become
+        stride swaps, products are flattened to chains and sums with scale factors to linear combinations.
+    """
+
+    def __mul__(self, other):
+        """ Returns an expression of a product with other expression, a matrix, a vector or a number """
+
+        if isinstance(other, Number):
+            return self._scaled(other)
+
+        return Chain([self, lazy(other)])
+
+    def __rmul__(self, other):
+        """ Returns an expression of a product of a number, a matrix or a vector with this expression """
+
+        if isinstance(other, Number):
+            return self._scaled(other)
+
+        return Chain([lazy(other), self])
+
+    def __div__(self, other):
+        """ Returns an expression divided by a number """
+
+        assert isinstance(other, Number)
+        return self._scaled(1.0 / other)
+
+    __truediv__ = __div__
+
+    def __add__(self, other):
+        """ Returns an expression of a sum with other expression, a matrix or a vector """
+
+        return Combination([(1, self), (1, lazy(other))])
+
+    def __radd__(self, other):
+        """ Returns an expression of a sum of a matrix or a vector with this expression """
+
+        return Combination([(1, lazy(other)), (1, self)])
+
+    def __sub__(self, other):
+        """ Returns an expression of a difference with other expression, a matrix or a vector """
+
+        return Combination([(1, self), (-1, lazy(other))])
+
+    def __rsub__(self, other):
+        """ Returns an expression of a difference of a matrix or a vector and this expression """
+
+        return Combination([(1, lazy(other)), (-1, self)])
+
+    def __neg__(self):
+        """ Returns a negated expression """
+
+        return self._scaled(-1)
+
+    def evaluate(self):
+        """ Evaluates an expression tree and returns a matrix, a vector or a scalar """
+
+        uses = {}
+        self._count(uses)
+        result = self._evaluate(_Cache(uses))
+
+        if self.kind == SCALAR:
+            return result[0][0]
+
+        if self.kind == COLUMN:
+            return Vector.from_buffer(result.column(0).values())
+
+        if self.kind == ROW:
+            return Vector.from_buffer(result[0].values())
+
+        # An operand evaluates to a view of the wrapped matrix, the result must not share its buffer
+        return result.copy() if isinstance(self, Operand) else result
+
+    def _scaled(self, factor):
+        """ Returns this expression multiplied by a number """
+
+        return Combination([(factor, self)])
+
+    def _count(self, uses):
+        """ Counts references to each node of a tree, so the cache can drop intermediates after their last use """
+
+        uses[id(self)] = uses.get(id(self), 0) + 1
+
+        if uses[id(self)] == 1:
+            for child in self._children():
+                child._count(uses)
+
+    def _children(self):
+        """ Returns child nodes of this node """
+
+        return []
+
+    @property
+    def transposed(self):
+        """ Returns an expression of a transpose """
+
+        raise NotImplementedError
+
+    @property
+    def T(self):
+        """ Returns an expression of a transpose """
+
+        return self.transposed
+
+    @property
+    def shape(self):
+        """ Returns the dimensions of an expression value """
+
+        raise NotImplementedError
+
+    @property
+    def kind(self):
+        """ Returns a kind of an expression value, a matrix, a column or a row vector, or a scalar """
+
+        raise NotImplementedError
+
+
+class Operand(Expression):
+    """ A matrix or a vector operand, possibly transposed """
+
+    def __init__(self, value, transpose=False):
+        self._value = value
+        self._transpose = transpose
+
+    def _evaluate(self, cache):
+        """ Returns a view of an operand as a matrix, a transpose only swaps strides """
+
+        value = self._value
+
+        if isinstance(value, Vector):
+            data, offset, dim, stride = value.buffer, value.offset, value.dim, value.stride
+
+            if self._transpose:
+                return Matrix.from_buffer(data, 1, dim, offset, (dim * stride, stride))
+
+            return Matrix.from_buffer(data, dim, 1, offset, (stride, 1))
+
+        if self._transpose:
+            row_stride, col_stride = value.strides
+            return Matrix.from_buffer(value.buffer, value.cols, value.rows, value.offset, (col_stride, row_stride))
+
+        return value
+
+    @property
+    def transposed(self):
+        return Operand(self._value, not self._transpose)
+
+    @property
+    def shape(self):
+        if isinstance(self._value, Vector):
+            return (1, self._value.dim) if self._transpose else (self._value.dim, 1)
+
+        rows, cols = self._value.dimensions
+        return (cols, rows) if self._transpose else (rows, cols)
+
+    @property
+    def kind(self):
+        if isinstance(self._value, Vector):
+            return ROW if self._transpose else COLUMN
+
+        return MATRIX
+
+
+class Chain(Expression):
+    """ A scaled product of a chain of factors, multiplied in the cheapest order on evaluation """
+
+    def __init__(self, factors, scale=1):
+        self._factors = []
+        self._scale = scale
+
+        # Flatten nested chains and move scale factors of single-term combinations to the chain
+        for factor in factors:
+            if isinstance(factor, Chain):
+                self._factors.extend(factor._factors)
+                self._scale *= factor._scale
+            elif isinstance(factor, Combination) and len(factor.terms) == 1:
+                scale, factor = factor.terms[0]
+                self._scale *= scale * (factor._scale if isinstance(factor, Chain) else 1)
+                self._factors.extend(factor._factors if isinstance(factor, Chain) else [factor])
+            else:
+                self._factors.append(factor)
+
+        for a, b in zip(self._factors, self._factors[1:]):
+            if a.shape[1] != b.shape[0]:
+                raise MatrixError("Matrix dimensions does not match")
+
+    def _evaluate(self, cache):
+        """ Multiplies the factors in an order that minimizes the number of scalar multiplications """
+
+        matrices = [cache.value(factor) for factor in self._factors]
+        dims = [self._factors[0].shape[0]] + [factor.shape[1] for factor in self._factors]
+        split = _chain_order(dims)
+        result = _multiply(matrices, split, 0, len(matrices) - 1)
+
+        if self._scale != 1:
+            result = Matrix.from_buffer(storage.compatible(result.buffer, [self._scale * v for v in result.values()]),
+                                        result.rows, result.cols)
+
+        return result
+
+    def _scaled(self, factor):
+        return Chain(self._factors, self._scale * factor)
+
+    def _children(self):
+        return self._factors
+
+    @property
+    def transposed(self):
+        return Chain([factor.transposed for factor in reversed(self._factors)], self._scale)
+
+    @property
+    def shape(self):
+        return self._factors[0].shape[0], self._factors[-1].shape[1]
+
+    @property
+    def kind(self):
+        first, last = self._factors[0].kind == ROW, self._factors[-1].kind == COLUMN
+
+        if first and last:
+            return SCALAR
+
+        return ROW if first else COLUMN if last else MATRIX
+
+
+class Combination(Expression):
+    """ A linear combination of expressions of the same shape, evaluated in a single fused pass """
+
+    def __init__(self, terms):
+        self.terms = []
+
+        # Flatten nested combinations, multiplying their scale factors
+        for scale, term in terms:
+            if isinstance(term, Combination):
+                self.terms.extend((scale * s, t) for s, t in term.terms)
+            else:
+                self.terms.append((scale, term))
+
+        for scale, term in self.terms:
+            if term.shape != self.terms[0][1].shape:
+                raise MatrixError("Matrix dimensions does not match")
+
+    def _evaluate(self, cache):
+        """ Accumulates all scaled terms into a single new buffer """
+
+        scales = [scale for scale, term in self.terms]
+        matrices = [cache.value(term) for scale, term in self.terms]
+        rows, cols = self.shape
+
+        buffers = [m.values() for m in matrices]
+        values = [sum(s * v for s, v in zip(scales, column)) for column in zip(*buffers)]
+
+        return Matrix.from_buffer(storage.compatible(buffers[0], values), rows, cols)
+
+    def _scaled(self, factor):
+        return Combination([(factor * scale, term) for scale, term in self.terms])
+
+    def _children(self):
+        return [term for scale, term in self.terms]
+
+    @property
+    def transposed(self):
+        return Combination([(scale, term.transposed) for scale, term in self.terms])
+
+    @property
+    def shape(self):
+        return self.terms[0][1].shape
+
+    @property
+    def kind(self):
+        return self.terms[0][1].kind
+
+
+class _Cache(object):
+    """ Keeps values of shared nodes until their last use """
+
+    def __init__(self, uses):
+        self._uses = uses
+        self._values = {}
+
+    def value(self, node):
+        """ Evaluates a node once and drops its value after the last reference to it is consumed """
+
+        key = id(node)
+
+        if key not in self._values:
+            self._values[key] = node._evaluate(self)
+
+        self._uses[key] -= 1
+
+        if self._uses[key] == 0:
+            return self._values.pop(key)
+
+        return self._values[key]
+
+
+def _chain_order(dims):
+    """ Finds an optimal parenthesization of a matrix chain by dynamic programming.
+
+        Factor i has dims[i] rows and dims[i + 1] columns, returns a table of the best split of each subchain.
+    """
+
+    n = len(dims) - 1
+    cost = [[0] * n for i in xrange(n)]
+    split = [[0] * n for i in xrange(n)]
+
+    for length in xrange(1, n):
+        for i in xrange(0, n - length):
+            j = i + length
+            cost[i][j] = None
+
+            for k in xrange(i, j):
+                c = cost[i][k] + cost[k + 1][j] + dims[i] * dims[k + 1] * dims[j + 1]
+
+                if cost[i][j] is None or c < cost[i][j]:
+                    cost[i][j], split[i][j] = c, k
+
+    return split
+
+
+def _multiply(matrices, split, i, j):
+    """ Multiplies a subchain of matrices in the order given by a split table """
+
+    if i == j:
+        return matrices[i]
+
+    k = split[i][j]
+
+    return _multiply(matrices, split, i, k) * _multiply(matrices, split, k + 1, j)
@@ -0,0 +1,148 @@
+import time
+from contextlib import contextmanager
+
+
+# A report of the innermost enabled instrumentation or None, instrumented code checks it before counting anything
+active = None
+
+
+class Report(object):
+    """ Counters and phase timings collected while an instrumentation is enabled """
+
+    def __init__(self):
+        self.flops = 0
+        self.row_operations = 0
+        self.allocations = {}
+        self.evaluations = {}
+        self.phases = {}
+
+    def __repr__(self):
+        """ Converts a report to a string value """
+
+        lines = ['flops: ' + str(self.flops), 'row operations: ' + str(self.row_operations)]
+        lines += ['allocations of ' + k + ': ' + str(v) for k, v in sorted(self.allocations.items())]
+        lines += ['evaluations in ' + k + ': ' + str(v) for k, v in sorted(self.evaluations.items())]
+        lines += ['time in ' + k + ': %.6fs' % v for k, v in sorted(self.phases.items())]
+
+        return '\n'.join(lines)
+
+    def evaluated(self, name, count=1):
+        """ Records function evaluations made by an algorithm """
+
+        self.evaluations[name] = self.evaluations.get(name, 0) + count
+
+    def elapsed(self, name, seconds):
+        """ Adds a wall time spent in an algorithm phase """
+
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+@contextmanager
+def instrument():
+    """ Enables instrumentation for a block of code and yields a report it fills.
+
+        Counting Vector and Matrix allocations replaces their __new__ only while the block runs, so disabled
+        instrumentation costs a single check of the active report per instrumented algorithm step.
+    """
+
+    # Importing here keeps the instrumented modules free to import this one
+    from matrix import Matrix
+    from vector import Vector
+
+    global active
+
+    previous = active
+    report = active = Report()
+    patched = [(cls, cls.__dict__.get('__new__')) for cls in (Vector, Matrix)]
+
+    # An already replaced __new__, like one of an enclosing instrumentation, keeps counting too
+    for cls, new in patched:
+        cls.__new__ = staticmethod(_counting_new(report, cls.__name__, cls.__new__ if new is not None else None))
+
+    try:
+        yield report
+    finally:
+        for cls, new in patched:
+            if new is None:
+                del cls.__new__
+            else:
+                cls.__new__ = new
+
+        active = previous
+
+        # Nested reports are a part of the enclosing one, allocations were already counted by both
+        if previous is not None:
+            _merge(previous, report)
+
+
+def phase(name):
+    """ Returns a context manager that records a wall time of an algorithm phase when instrumentation is enabled """
+
+    return _Phase(active, name) if active is not None else _DISABLED
+
+
+def counted(f, name):
+    """ Returns a function that records its evaluations under a given name, or f itself when disabled """
+
+    report = active
+
+    if report is None:
+        return f
+
+    def wrapper(*args):
+        report.evaluated(name)
+        return f(*args)
+
+    return wrapper
+
+
+class _Phase(object):
+    """ Measures a wall time of a phase and adds it to a report """
+
+    def __init__(self, report, name):
+        self._report = report
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        self._report.elapsed(self._name, time.time() - self._start)
+
+
+class _DisabledPhase(object):
+    """ A phase that does nothing while instrumentation is disabled """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_DISABLED = _DisabledPhase()
+
+
+def _counting_new(report, name, new):
+    """ Returns a __new__ replacement that counts allocations of a class """
+
+    def counting_new(cls, *args, **kwargs):
+        report.allocations[name] = report.allocations.get(name, 0) + 1
+        return new(cls, *args, **kwargs) if new is not None else object.__new__(cls)
+
+    return counting_new
+
+
+def _merge(target, source):
+    """ Adds counters and timings of one report to another """
+
+    target.flops += source.flops
+    target.row_operations += source.row_operations
+
+    for counters in ('evaluations', 'phases'):
+        merged = getattr(target, counters)
+
+        for k, v in getattr(source, counters).items():
+            merged[k] = merged.get(k, 0) + v
@@ -0,0 +1,123 @@
+from operator import mul
+
+import instrumentation
+from matrix import Matrix, MatrixError
+from vector import Vector
+from algorithms import inplace_upper_triangular, is_close, PARTIAL
+
+
+class LU(object):
+    """ LU factorization of a square matrix with partial pivoting, P * A = L * U """
+
+    def __init__(self, matrix):
+        """ Factorizes an input matrix once, so that systems with it can be solved in O(n^2) """
+
+        assert isinstance(matrix, Matrix)
+
+        if matrix.rows != matrix.cols:
+            raise MatrixError("LU factorization requires a square matrix")
+
+        n = matrix.rows
+
+        # Exact matrices are factorized over fractions, so that the divisions stay exact
+        element = matrix.element if matrix.is_exact else None
+
+        self._lower = Matrix(n, n, matrix.element)
+        self._permutation = range(n)
+        self._upper, self._sign = inplace_upper_triangular(matrix.copy(element), self._lower, self._permutation,
+                                                           pivoting=PARTIAL)
+
+        for i in range(n):
+            self._lower[i][i] = 1
+
+        # Pack the strictly lower and strictly upper parts of each row once for the substitution loops
+        self._diagonal = [self._upper[i][i] for i in range(n)]
+        self._l_rows = [list(self._lower[i].values())[:i] for i in range(n)]
+        self._u_rows = [list(self._upper[i].values())[i + 1:] for i in range(n)]
+
+    def solve(self, b):
+        """ Solves the system A * x = b and returns x """
+
+        if not isinstance(b, Vector):
+            b = Vector(b, element=self._upper.element)
+
+        if b.dim != self.size:
+            raise MatrixError("Matrix and vector dimensions do not match")
+
+        if self.is_singular:
+            raise MatrixError("Matrix is singular")
+
+        # Forward substitution, L * y = P * b
+        with instrumentation.phase('lu forward substitution'):
+            y = []
+            for i, p in enumerate(self._permutation):
+                y.append(b[p] - sum(map(mul, self._l_rows[i], y)))
+
+        # Back substitution, U * x = y
+        with instrumentation.phase('lu back substitution'):
+            x = [0.0] * self.size
+            for i in range(self.size - 1, -1, -1):
+                x[i] = (y[i] - sum(map(mul, self._u_rows[i], x[i + 1:]))) / self._diagonal[i]
+
+        if instrumentation.active is not None:
+            instrumentation.active.flops += 2 * self.size * self.size
+
+        return Vector(x, element=self._upper.element)
+
+    def solve_many(self, b):
+        """ Solves the system A * X = B for each column of B and returns X """
+
+        assert isinstance(b, Matrix)
+
+        if b.rows != self.size:
+            raise MatrixError("Matrix dimensions does not match")
+
+        return Matrix.from_column_vectors([self.solve(b.column(j)) for j in range(b.cols)])
+
+    def det(self):
+        """ Returns a determinant of the factorized matrix """
+
+        result = self._sign
+
+        for v in self._diagonal:
+            result *= v
+
+        return result
+
+    def inverse(self):
+        """ Returns an inverse of the factorized matrix """
+
+        return self.solve_many(Matrix.identity(self.size, self._upper.element))
+
+    @property
+    def is_singular(self):
+        """ Returns true if the factorized matrix is singular """
+
+        if self._upper.is_exact:
+            return any(v == 0 for v in self._diagonal)
+
+        return any(is_close(v, 0.0) for v in self._diagonal)
+
+    @property
+    def lower(self):
+        """ Returns the unit lower triangular factor """
+
+        return self._lower
+
+    @property
+    def upper(self):
+        """ Returns the upper triangular factor """
+
+        return self._upper
+
+    @property
+    def permutation(self):
+        """ Returns the row permutation as a list of original row indices """
+
+        return self._permutation
+
+    @property
+    def size(self):
+        """ Returns a size of the factorized matrix """
+
+        return len(self._diagonal)
@@ -1,3 +1,9 @@
+from fractions import Fraction
+
+import disk
+import instrumentation
+import multiply
+import storage
 from vector import Vector
 
 
@@ -7,108 +13,189 @@ class MatrixError(Exception):
 
 
 class Matrix(object):
-    def __init__(self, rows, cols):
-        """ Constructs an instance of a Matrix class as a list of row vectors"""
+    def __init__(self, rows, cols, element=float):
+        """ Constructs an instance of a Matrix class stored in a single contiguous row-major buffer """
 
-        self._items = [Vector([0] * cols) for x in range(rows)]
+        self._data = storage.allocate(rows * cols, element)
+        self._offset = 0
+        self._strides = (cols, 1)
         self._rows = rows
         self._cols = cols
 
     def __repr__(self):
         """ Converts a matrix to a string value """
 
-        return '\n'.join([repr(row) for row in self._items])
+        return '\n'.join([repr(row) for row in self])
 
     def __setitem__(self, index, value):
-        """ Sets a matrix row at specified index """
+        """ Copies values of a given row vector to a matrix row at specified index """
 
         assert index >= 0
         assert index < self.rows
 
         if not isinstance(value, Vector):
-            value = Vector(value)
+            value = Vector(value, element=self.element)
 
         if value.dim != self.cols:
             raise MatrixError("Matrix and vector dimensions do not match")
 
-        self.items[index] = value
+        row_stride, col_stride = self._strides
+        storage.strided_assign(self._data, self._offset + index * row_stride, self._cols, col_stride, value.values())
 
     def __getitem__(self, index):
-        """ Returns a matrix row at specified index """
+        """ Returns a view of a matrix row at specified index """
 
         assert index >= 0
         assert index < self.rows
-        return self.items[index]
+
+        row_stride, col_stride = self._strides
+        return Vector.view(self._data, self._offset + index * row_stride, self._cols, col_stride)
 
     def __iter__(self):
         """ Returns a matrix rows iterator """
 
-        return self.items.__iter__()
+        return iter(self.items)
 
     def __mul__(self, other):
         """ Multiplies matrix with other matrix """
 
+        report = instrumentation.active
+
         if isinstance(other, Vector):
             assert other.dim == self.cols
-            result = Vector()
 
-            for i in xrange(self.cols):
-                result.append(self[i] * other)
+            if report is not None:
+                report.flops += 2 * self.rows * self.cols
 
-            return result
+            return Vector([row * other for row in self], element=self.element)
 
-        assert isinstance(other, Matrix)
+        # Let other operands, like lazy expressions, handle the product
+        if not isinstance(other, Matrix):
+            return NotImplemented
 
         if self.cols != other.rows:
             raise MatrixError("Matrix dimensions does not match")
 
-        result = Matrix(self.rows, other.cols)
+        if report is not None:
+            report.flops += 2 * self.rows * self.cols * other.cols
 
-        for i in range(0, result.rows):
-            for j in range(0, result.cols):
-                result[i][j] = self[i] * other.column(j)
+        with instrumentation.phase('multiplication'):
+            return Matrix.from_buffer(multiply.gemm(self, other), self.rows, other.cols)
 
-        return result
+    def multiply(self, other, executor=None, tile_size=multiply.TILE_SIZE, processes=None):
+        """ Multiplies matrix with other matrix, computing tiles of the product concurrently """
+
+        assert isinstance(other, Matrix)
+
+        if self.cols != other.rows:
+            raise MatrixError("Matrix dimensions does not match")
+
+        if instrumentation.active is not None:
+            instrumentation.active.flops += 2 * self.rows * self.cols * other.cols
+
+        return Matrix.from_buffer(multiply.gemm_parallel(self, other, executor, tile_size, processes), self.rows,
+                                  other.cols)
 
     def set(self, other):
         """ Copies values from an input matrix """
 
         assert other.dimensions == self.dimensions
         for i, row in enumerate(other):
-            self._items[i] = row
+            self[i] = row
+
+    def copy(self, element=None):
+        """ Returns a copy of this matrix, optionally converting the elements to a given type """
+
+        if element is not None:
+            return Matrix.from_buffer(storage.from_values(self.values(), element), self.rows, self.cols)
+
+        return Matrix.from_buffer(self.values(), self.rows, self.cols)
+
+    def values(self):
+        """ Returns a copy of the matrix elements as a contiguous row-major buffer """
+
+        if self.is_contiguous:
+            return storage.strided_slice(self._data, self._offset, self.rows * self.cols, 1)
+
+        result = storage.allocate_like(self._data, self.rows * self.cols)
+        for i, row in enumerate(self):
+            storage.strided_assign(result, i * self.cols, self.cols, 1, row.values())
+
+        return result
 
-    def copy(self):
-        """ Returns a copy of this matrix """
+    def save(self, path):
+        """ Writes this matrix to a binary matrix file """
 
-        return Matrix.from_rows([v.items for v in self.items])
+        assert not self.is_exact
+        disk.write(path, self.rows, self.cols, self.values())
+
+    def block(self, row, col, rows, cols):
+        """ Returns a view of a rectangular block of this matrix that shares its storage """
+
+        assert 0 <= row and row + rows <= self.rows
+        assert 0 <= col and col + cols <= self.cols
+
+        row_stride, col_stride = self._strides
+        return Matrix.from_buffer(self._data, rows, cols, self._offset + row * row_stride + col * col_stride,
+                                  self._strides)
+
+    def row_blocks(self, block_rows):
+        """ Yields (row, block) pairs of views over consecutive bands of at most block_rows rows """
+
+        for row in xrange(0, self.rows, block_rows):
+            yield row, self.block(row, 0, min(block_rows, self.rows - row), self.cols)
+
+    def blocks(self, block_rows, block_cols):
+        """ Yields (row, col, block) tuples of views that tile this matrix in a row-major order """
+
+        for row in xrange(0, self.rows, block_rows):
+            rows = min(block_rows, self.rows - row)
+
+            for col in xrange(0, self.cols, block_cols):
+                yield row, col, self.block(row, col, rows, min(block_cols, self.cols - col))
 
     def sort_rows(self, predicate, start_from=0):
         """ Sorts the matrix rows with a predicate """
 
-        self._items[start_from:] = sorted(self._items[start_from:], key=predicate)
+        order = sorted(range(start_from, self.rows), key=lambda i: predicate(self[i]))
+        rows = [self[i].values() for i in order]
+
+        for i, values in enumerate(rows):
+            self[start_from + i].assign(values)
 
     def swap_rows(self, a, b):
         """ Swaps two rows by their indices """
 
-        temp = self._items[a]
-        self._items[a] = self._items[b]
-        self._items[b] = temp
+        row_a, row_b = self[a], self[b]
+        temp = row_a.values()
+        row_a.assign(row_b.values())
+        row_b.assign(temp)
+
+    def swap_columns(self, a, b):
+        """ Swaps two columns by their indices """
+
+        column_a, column_b = self.column(a), self.column(b)
+        temp = column_a.values()
+        column_a.assign(column_b.values())
+        column_b.assign(temp)
 
     def column(self, index):
-        """ Returns a column vector at specified index """
+        """ Returns a strided view of a column vector at specified index """
 
         assert index >= 0
         assert index < self.cols
 
-        return Vector([row[index] for row in self])
+        row_stride, col_stride = self._strides
+        return Vector.view(self._data, self._offset + index * col_stride, self._rows, row_stride)
 
     def zero_small_values(self, tolerance=1e-09):
-        """ Converts all values that are near the zero to zero """
+        """ Converts all values that are near the zero to zero, exact matrices are left untouched """
+
+        if self.is_exact:
+            return
 
         for r in self:
-            for i, v in enumerate(r):
-                if abs(v) < tolerance:
-                    r[i] = 0
+            r.assign([0 if abs(v) < tolerance else v for v in r.values()])
 
     def for_each(self, predicate, row_indices=None):
         """ Invokes a predicate for each row of a matrix """
@@ -127,7 +214,12 @@ class Matrix(object):
         if row.dim != self.cols:
             raise MatrixError("Wrong row size")
 
-        self._items.append(row)
+        if not self.is_contiguous or len(self._data) != self.rows * self.cols or storage.is_mapped(self._data):
+            self._data = self.values()
+            self._offset = 0
+            self._strides = (self.cols, 1)
+
+        self._data.extend(row.values())
         self._rows += 1
 
     def append_column(self, column):
@@ -138,16 +230,59 @@ class Matrix(object):
         if column.dim != self.rows:
             raise MatrixError("Wrong column size: " + str(self.rows) + " expected, got " + str(column.dim))
 
-        for i, v in enumerate(column):
-            self._items[i].append(v)
+        cols = self.cols + 1
+        data = storage.allocate_like(self._data, self.rows * cols)
 
-        self._cols += 1
+        for i, row in enumerate(self):
+            storage.strided_assign(data, i * cols, self.cols, 1, row.values())
+        storage.strided_assign(data, self.cols, self.rows, cols, column.values())
+
+        self._data = data
+        self._offset = 0
+        self._strides = (cols, 1)
+        self._cols = cols
 
     @property
     def items(self):
-        """ Returns a collection of matrix rows """
+        """ Returns a collection of matrix row views """
 
-        return self._items
+        return [self[i] for i in range(0, self.rows)]
+
+    @property
+    def buffer(self):
+        """ Returns the underlying storage buffer """
+
+        return self._data
+
+    @property
+    def offset(self):
+        """ Returns an offset of the first matrix element in the storage buffer """
+
+        return self._offset
+
+    @property
+    def strides(self):
+        """ Returns the distances between adjacent rows and adjacent columns in the storage buffer """
+
+        return self._strides
+
+    @property
+    def is_exact(self):
+        """ Returns true if this matrix stores exact elements instead of floats """
+
+        return storage.is_exact(self._data)
+
+    @property
+    def element(self):
+        """ Returns a type new elements of this matrix are created with """
+
+        return Fraction if self.is_exact else float
+
+    @property
+    def is_contiguous(self):
+        """ Returns true if the matrix elements are stored as a dense row-major block """
+
+        return self._strides == (self.cols, 1)
 
     @property
     def rows(self):
@@ -177,41 +312,74 @@ class Matrix(object):
     def read_from_input(cls):
         """ Reads a matrix from the input """
 
-        nm = list(map(int, input().split()))
+        nm = list(map(int, raw_input().split()))
 
         result = []
         for i in range(0, nm[0]):
-            result.append(list(map(int, input().split())))
+            result.append(list(map(int, raw_input().split())))
 
-        return Matrix.from_values(result)
+        return Matrix.from_rows(result)
 
     @classmethod
     def read_square_from_input(cls):
         """ Reads a matrix from the input """
 
-        nm = list(map(int, input().split()))
+        nm = list(map(int, raw_input().split()))
 
         result = []
         for i in range(0, nm[0]):
-            result.append(list(map(int, input().split())))
+            result.append(list(map(int, raw_input().split())))
+
+        return Matrix.from_rows(result)
+
+    @classmethod
+    def open_mmap(cls, path, writable=True):
+        """ Memory-maps a binary matrix file, writes to the matrix go straight to the file unless it is read-only """
 
-        return Matrix.from_values(result)
+        return Matrix.from_buffer(*disk.map_file(path, writable))
 
     @classmethod
-    def identity(cls, dimensions):
+    def load_text(cls, path, delimiter=None):
+        """ Loads a whitespace or delimiter separated text matrix in bulk """
+
+        return Matrix.from_buffer(*disk.read_text(path, delimiter))
+
+    @classmethod
+    def identity(cls, dimensions, element=float):
         """ Constructs the identity matrix """
 
-        result = Matrix(dimensions, dimensions)
+        result = Matrix(dimensions, dimensions, element)
         for i, row in enumerate(result):
             row[i] = 1
 
         return result
 
     @classmethod
-    def from_rows(cls, rows):
+    def from_buffer(cls, data, rows, cols, offset=0, strides=None):
+        """ Constructs a matrix that references an existing storage buffer without copying it """
+
+        result = Matrix.__new__(Matrix)
+        result._data = data
+        result._offset = offset
+        result._strides = strides if strides is not None else (cols, 1)
+        result._rows = rows
+        result._cols = cols
+
+        return result
+
+    @classmethod
+    def from_rows(cls, rows, element=float):
         """ Constructs a matrix from a list of rows """
 
-        return Matrix.from_row_vectors([Vector(v) for v in rows])
+        assert len(rows) > 0
+
+        cols = len(rows[0])
+
+        for row in rows:
+            if len(row) != cols:
+                raise MatrixError("Wrong row size")
+
+        return Matrix.from_buffer(storage.from_values([v for row in rows for v in row], element), len(rows), cols)
 
     @classmethod
     def from_row_vectors(cls, rows):
@@ -219,29 +387,33 @@ class Matrix(object):
 
         assert len(rows) > 0
 
-        result = Matrix(0, rows[0].dim)
+        result = Matrix(0, rows[0].dim, Fraction if rows[0].is_exact else float)
         for row in rows:
             result.append_row(row)
 
         return result
 
     @classmethod
-    def from_columns(cls, columns):
+    def from_columns(cls, columns, element=float):
         """ Constructs a matrix from a list of columns """
 
-        return Matrix.from_column_vectors([Vector(v) for v in columns])
+        assert len(columns) > 0
+
+        rows = len(columns[0])
+
+        for column in columns:
+            if len(column) != rows:
+                raise MatrixError("Wrong column size: " + str(rows) + " expected, got " + str(len(column)))
+
+        return Matrix.from_buffer(storage.from_values([v for row in zip(*columns) for v in row], element), rows,
+                                  len(columns))
 
     @classmethod
     def from_column_vectors(cls, columns):
         """ Constructs a matrix from a list of column vectors """
 
-        assert len(columns) > 0
-
-        result = Matrix(columns[0].dim, 0)
-        for column in columns:
-            result.append_column(column)
-
-        return result
+        element = Fraction if columns and columns[0].is_exact else float
+        return Matrix.from_columns([column.values() for column in columns], element)
 
 assert Matrix(4, 3).dimensions == (4, 3)
 
@@ -0,0 +1,181 @@
+import multiprocessing
+from multiprocessing.pool import Pool, ThreadPool
+from multiprocessing.sharedctypes import RawArray
+from operator import mul
+
+import storage
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
+
+
+# Number of output rows and columns computed per tile
+BLOCK_SIZE = 32
+
+# Number of output rows and columns computed per parallel task
+TILE_SIZE = 128
+
+# Shared operands and product of a worker process, set by a pool initializer
+_shared = None
+
+
+def gemm(a, b, block_size=BLOCK_SIZE):
+    """ Multiplies two matrices and returns the product as a contiguous row-major buffer """
+
+    assert a.cols == b.rows
+
+    if numpy is not None and not storage.is_exact(a.buffer) and not storage.is_exact(b.buffer):
+        return gemm_numpy(a, b)
+
+    return gemm_blocked(a, b, block_size)
+
+
+def gemm_blocked(a, b, block_size=BLOCK_SIZE):
+    """ Multiplies two matrices with a tiled kernel over a packed transpose of the right operand """
+
+    rows, cols = a.rows, b.cols
+    result = storage.allocate_like(a.buffer, rows * cols)
+
+    # Pack both operands once, so the inner loop only walks contiguous lists
+    lhs = [list(a[i].values()) for i in range(rows)]
+    rhs = [list(b.column(j).values()) for j in range(cols)]
+
+    for j0 in range(0, cols, block_size):
+        j1 = min(j0 + block_size, cols)
+        tile = rhs[j0:j1]
+
+        for i0 in range(0, rows, block_size):
+            for i in range(i0, min(i0 + block_size, rows)):
+                row = lhs[i]
+                offset = i * cols
+                result[offset + j0:offset + j1] = storage.compatible(result, [sum(map(mul, row, column)) for column in tile])
+
+    return result
+
+
+def gemm_numpy(a, b):
+    """ Multiplies two matrices with NumPy """
+
+    lhs = numpy.frombuffer(a.values(), dtype=numpy.float64).reshape(a.rows, a.cols)
+    rhs = numpy.frombuffer(b.values(), dtype=numpy.float64).reshape(b.rows, b.cols)
+
+    return storage.from_bytes(numpy.dot(lhs, rhs).tostring())
+
+
+def gemm_parallel(a, b, executor=None, tile_size=TILE_SIZE, processes=None):
+    """ Multiplies two matrices by splitting the product into tiles computed concurrently.
+
+        An executor is any object with a map method, like a ThreadPool, which suits the NumPy kernel that releases
+        the GIL, or a process pool, whose tasks carry copies of their rows and columns and return their tiles.
+        Without one, the pure-Python kernel runs in a pool of processes that inherit the operands and write the
+        product to shared memory.
+    """
+
+    assert a.cols == b.rows
+
+    if storage.is_exact(a.buffer) or storage.is_exact(b.buffer):
+        return gemm(a, b)
+
+    rows, cols, depth = a.rows, b.cols, a.cols
+
+    # Pack the left operand row-major and the right one column-major, so both are read contiguously
+    lhs = RawArray('d', rows * depth)
+    rhs = RawArray('d', cols * depth)
+    result = RawArray('d', rows * cols)
+
+    storage.strided_assign(lhs, 0, rows * depth, 1, a.values())
+
+    for j in xrange(cols):
+        storage.strided_assign(rhs, j * depth, depth, 1, b.column(j).values())
+
+    shape = rows, cols, depth
+    tiles = [(i, min(i + tile_size, rows), j, min(j + tile_size, cols))
+             for i in xrange(0, rows, tile_size) for j in xrange(0, cols, tile_size)]
+
+    if executor is not None and _is_process_pool(executor):
+        # Shared memory cannot be pickled to the workers of an existing pool, so tiles travel both ways instead
+        tasks = [(storage.strided_slice(lhs, i0 * depth, (i1 - i0) * depth, 1),
+                  storage.strided_slice(rhs, j0 * depth, (j1 - j0) * depth, 1), (i1 - i0, j1 - j0, depth))
+                 for i0, i1, j0, j1 in tiles]
+
+        for (i0, i1, j0, j1), values in zip(tiles, executor.map(_copied_tile_task, tasks)):
+            width = j1 - j0
+
+            for i in xrange(i0, i1):
+                start = (i - i0) * width
+                storage.strided_assign(result, i * cols + j0, width, 1, values[start:start + width])
+    elif executor is not None:
+        # Consume the results, so that lazy maps compute every tile and errors of tiles are raised here
+        list(executor.map(_tile_task, [(lhs, rhs, result, shape, tile) for tile in tiles]))
+    elif processes == 1 or len(tiles) < 2:
+        map(_tile_task, [(lhs, rhs, result, shape, tile) for tile in tiles])
+    else:
+        processes = processes or multiprocessing.cpu_count()
+        pool = multiprocessing.Pool(processes, initializer=_share, initargs=(lhs, rhs, result, shape))
+
+        try:
+            pool.map(_shared_tile_task, tiles, max(1, len(tiles) // (4 * processes)))
+        finally:
+            pool.close()
+            pool.join()
+
+    return storage.strided_slice(result, 0, rows * cols, 1)
+
+
+def _is_process_pool(executor):
+    """ Returns true if an executor runs tasks in other processes, which cannot share the packed buffers """
+
+    if isinstance(executor, Pool):
+        return not isinstance(executor, ThreadPool)
+
+    return ProcessPoolExecutor is not None and isinstance(executor, ProcessPoolExecutor)
+
+
+def _share(lhs, rhs, result, shape):
+    """ Stores the shared operands and product in a worker process """
+
+    global _shared
+    _shared = lhs, rhs, result, shape
+
+
+def _shared_tile_task(tile):
+    """ Computes a product tile from the buffers shared with a worker process """
+
+    lhs, rhs, result, shape = _shared
+    _tile_task((lhs, rhs, result, shape, tile))
+
+
+def _copied_tile_task(task):
+    """ Computes a product tile from copies of its rows and columns and returns it as a row-major buffer """
+
+    lhs, rhs, (rows, cols, depth) = task
+    result = storage.allocate(rows * cols)
+
+    _tile_task((lhs, rhs, result, (rows, cols, depth), (0, rows, 0, cols)))
+    return result
+
+
+def _tile_task(task):
+    """ Computes a product tile from packed operands and writes it to the product buffer """
+
+    lhs, rhs, result, (rows, cols, depth), (i0, i1, j0, j1) = task
+
+    if numpy is not None:
+        a = numpy.frombuffer(lhs, dtype=numpy.float64).reshape(rows, depth)
+        b = numpy.frombuffer(rhs, dtype=numpy.float64).reshape(cols, depth)
+        c = numpy.frombuffer(result, dtype=numpy.float64).reshape(rows, cols)
+        c[i0:i1, j0:j1] = numpy.dot(a[i0:i1], b[j0:j1].T)
+        return
+
+    columns = [storage.strided_slice(rhs, j * depth, depth, 1) for j in xrange(j0, j1)]
+
+    for i in xrange(i0, i1):
+        row = storage.strided_slice(lhs, i * depth, depth, 1)
+        storage.strided_assign(result, i * cols + j0, j1 - j0, 1, [sum(map(mul, row, column)) for column in columns])
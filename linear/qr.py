@@ -0,0 +1,156 @@
+from math import sqrt
+from operator import mul
+
+from matrix import Matrix
+
+
+# Orthogonalization methods of a QR decomposition
+HOUSEHOLDER = 'householder'
+MGS = 'mgs'
+
+# A column that keeps less than this fraction of its original norm after orthogonalization is linearly dependent
+DEPENDENCE_TOLERANCE = 1e-12
+
+
+def qr(matrix, method=HOUSEHOLDER, pivoting=False):
+    """ Computes a thin QR decomposition of a matrix in a single pass.
+
+        Returns (Q, R) with orthonormal columns of Q, or (Q, R, permutation) when column pivoting is enabled,
+        in which case the diagonal of R is non-increasing in magnitude and reveals the numerical rank.
+
+        A modified Gram-Schmidt process has no direction to give a linearly dependent column, so its column
+        of Q and its diagonal entry of R are zero, and Q is orthonormal on the independent columns only.
+    """
+
+    columns = [list(matrix.column(j).values()) for j in range(0, matrix.cols)]
+    permutation = range(0, matrix.cols)
+
+    if method == HOUSEHOLDER:
+        q, r = _householder(columns, matrix.rows, permutation if pivoting else None)
+    elif method == MGS:
+        q, r = _modified_gram_schmidt(columns, matrix.rows, permutation if pivoting else None)
+    else:
+        raise ValueError("Unknown QR method: " + str(method))
+
+    size = len(q)
+    q = Matrix.from_columns(q) if size else Matrix(matrix.rows, 0)
+    r = Matrix.from_rows(r) if size else Matrix(0, matrix.cols)
+
+    return (q, r, permutation) if pivoting else (q, r)
+
+
+def _dot(a, b):
+    """ Returns a dot product of two lists """
+
+    return sum(map(mul, a, b))
+
+
+def _pivot(columns, norms, k, permutation):
+    """ Moves the remaining column with the largest norm to position k and returns its former position """
+
+    if permutation is None:
+        return k
+
+    j = max(range(k, len(columns)), key=lambda i: norms[i])
+
+    if j != k:
+        columns[k], columns[j] = columns[j], columns[k]
+        norms[k], norms[j] = norms[j], norms[k]
+        permutation[k], permutation[j] = permutation[j], permutation[k]
+
+    return j
+
+
+def _householder(columns, rows, permutation):
+    """ Triangularizes columns in place with Householder reflections and returns Q and R as lists """
+
+    size = min(rows, len(columns))
+    norms = [_dot(c, c) for c in columns]
+    reflectors = []
+
+    for k in range(0, size):
+        _pivot(columns, norms, k, permutation)
+
+        x = columns[k][k:]
+        length = sqrt(_dot(x, x))
+        alpha = -length if x[0] >= 0.0 else length
+
+        v = x
+        v[0] -= alpha
+        v_norm = _dot(v, v)
+        reflectors.append((v, v_norm))
+
+        if v_norm == 0.0:
+            continue
+
+        for j in range(k + 1, len(columns)):
+            column = columns[j]
+            w = 2.0 * _dot(v, column[k:]) / v_norm
+            column[k:] = [a - w * b for a, b in zip(column[k:], v)]
+
+            # Downdate the remaining norm, the entry in row k moves to R
+            norms[j] -= column[k] * column[k]
+
+        columns[k][k:] = [alpha] + [0.0] * (rows - k - 1)
+
+    r = [[columns[j][i] if j >= i else 0.0 for j in range(0, len(columns))] for i in range(0, size)]
+
+    # Accumulate the thin Q by applying the reflectors in a reverse order to the leading identity columns
+    q = []
+
+    for i in range(0, size):
+        e = [0.0] * rows
+        e[i] = 1.0
+
+        for k in range(size - 1, -1, -1):
+            v, v_norm = reflectors[k]
+
+            if v_norm == 0.0:
+                continue
+
+            w = 2.0 * _dot(v, e[k:]) / v_norm
+            e[k:] = [a - w * b for a, b in zip(e[k:], v)]
+
+        q.append(e)
+
+    return q, r
+
+
+def _modified_gram_schmidt(columns, rows, permutation):
+    """ Orthonormalizes columns in place with a modified Gram-Schmidt process and returns Q and R as lists """
+
+    size = min(rows, len(columns))
+    norms = [_dot(c, c) for c in columns]
+    original = [sqrt(n) for n in norms]
+    r = [[0.0] * len(columns) for i in range(0, size)]
+    q = []
+
+    for k in range(0, size):
+        j = _pivot(columns, norms, k, permutation)
+        original[k], original[j] = original[j], original[k]
+
+        # Swap the already computed R entries together with the columns
+        for i in range(0, k):
+            r[i][k], r[i][j] = r[i][j], r[i][k]
+
+        v = columns[k]
+        length = sqrt(_dot(v, v))
+
+        # Normalizing the rounding residue of a dependent column would produce a direction that is not orthogonal
+        if length <= DEPENDENCE_TOLERANCE * original[k]:
+            length = 0.0
+
+        r[k][k] = length
+
+        e = [a / length for a in v] if length > 0.0 else [0.0] * rows
+        q.append(e)
+
+        # Remove the new direction from every remaining column right away, which keeps Q orthogonal
+        for j in range(k + 1, len(columns)):
+            column = columns[j]
+            projection = _dot(e, column)
+            r[k][j] = projection
+            columns[j] = [a - projection * b for a, b in zip(column, e)]
+            norms[j] -= projection * projection
+
+    return q, r
@@ -1,44 +1,143 @@
+import algorithms
 from matrix import Matrix
 from vector import Vector
-from algorithms import inplace_gauss_elimination, column_space, null_space, det, linear_combination, gram_schmidt, bilinear, quadratic
 
 
-class RRef(Matrix):
-    """ Matrix in a reduced row echelon form """
+class RRef(object):
+    """ Reduced row echelon form of a matrix and the spaces derived from it """
 
-    def __init__(self, matrix):
-        """ Constructs a reduced row echelon form matrix from a given input """
+    def __init__(self, matrix, pivoting=None):
+        """ Constructs a reduced row echelon form of a given input, the elimination runs on first access """
 
         assert isinstance(matrix, Matrix)
 
-        Matrix.__init__(self, matrix.rows, matrix.cols)
-        self.set(matrix)
-        self._pivots = inplace_gauss_elimination(self)
-
         self._original = matrix
-        self._pivot_columns = [column for row, column in self._pivots]
-        self._free_columns = [i for i in range(0, matrix.cols) if i not in self._pivot_columns]
+        self._pivoting = pivoting or algorithms.PARTIAL
+        self._permutation = None
+
+        # Exact matrices are reduced over fractions, so that the divisions stay exact
+        self._element = matrix.element if matrix.is_exact else None
+        self._matrix = None
+        self._transform = None
+        self._pivots = None
+        self._free_columns = None
+        self._spaces = {}
+
+    def _eliminate(self, transform=False):
+        """ Runs a Gauss-Jordan elimination once, optionally tracking the row operations """
+
+        if self._matrix is not None and (self._transform is not None or not transform):
+            return
+
+        rows, cols = self._original.dimensions
+        self._permutation = range(0, rows)
+
+        if transform:
+            # Eliminate [A | I] with pivots restricted to A, so the right block accumulates the row operations
+            augmented = self._original.copy(self._element)
+
+            for i in range(0, rows):
+                augmented.append_column(Vector([1 if j == i else 0 for j in range(0, rows)], element=augmented.element))
+
+            self._pivots, self._free_columns = algorithms.inplace_gauss_elimination(augmented, cols, self._pivoting,
+                                                                                     self._permutation)
+            self._matrix = Matrix.from_rows([row.values()[:cols] for row in augmented], augmented.element)
+            self._transform = Matrix.from_rows([row.values()[cols:] for row in augmented], augmented.element)
+        else:
+            self._matrix = self._original.copy(self._element)
+            self._pivots, self._free_columns = algorithms.inplace_gauss_elimination(self._matrix, None, self._pivoting,
+                                                                                     self._permutation)
+
+    def _basis(self, vectors, dim):
+        """ Constructs a matrix with given basis vectors as columns """
+
+        if not vectors:
+            return Matrix(dim, 0, self._original.element)
+
+        return Matrix.from_column_vectors(vectors)
+
+    def _space(self, name, build):
+        """ Returns a memoized derived space """
+
+        if name not in self._spaces:
+            self._spaces[name] = build()
+
+        return self._spaces[name]
+
+    @property
+    def matrix(self):
+        """ Returns the matrix in a reduced row echelon form """
+
+        self._eliminate()
+        return self._matrix
+
+    @property
+    def pivots(self):
+        """ Returns a list of (row, column) pivot positions """
+
+        self._eliminate()
+        return self._pivots
+
+    @property
+    def permutation(self):
+        """ Returns the row permutation of an elimination as a list of original row indices """
+
+        self._eliminate()
+        return self._permutation
 
     @property
     def null_space(self):
-        """ Returns a null space as a matrix """
+        """ Returns a null space basis as columns of a matrix """
+
+        def build():
+            result = Matrix(self.cols, len(self.free_columns), self.matrix.element)
+
+            for pivot_row, pivot_column in self.pivots:
+                row = self.matrix[pivot_row]
+
+                for j, free in enumerate(self.free_columns):
+                    result[pivot_column][j] = -row[free]
+
+            for i, column in enumerate(self.free_columns):
+                result[column][i] = 1
+
+            return result
+
+        return self._space('null', build)
+
+    @property
+    def column_space(self):
+        """ Returns a column space basis, the pivot columns of the original matrix, as columns of a matrix """
+
+        return self._space('column', lambda: self._basis([self._original.column(c) for c in self.pivot_columns],
+                                                         self.rows))
+
+    @property
+    def row_space(self):
+        """ Returns a row space basis, the non-zero rows of a reduced form, as columns of a matrix """
+
+        return self._space('row', lambda: self._basis([self.matrix[r] for r, c in self.pivots], self.cols))
 
-        result = Matrix(self.cols, len(self.free_columns))
+    @property
+    def left_null_space(self):
+        """ Returns a null space of the transposed matrix as columns of a matrix.
 
-        for pivot_row, pivot_column in self._pivots:
-            for j, free in enumerate(self.free_columns):
-                result[pivot_column][j] = -self[pivot_row][free]
+            It is read from the row operations of the elimination, which are tracked only when this
+            space is requested, so the first access runs an elimination of an augmented matrix.
+        """
 
-        for i, column in enumerate(self.free_columns):
-            result[column][i] = 1.0
+        def build():
+            self._eliminate(transform=True)
+            pivot_rows = set(row for row, column in self.pivots)
+            return self._basis([self._transform[r] for r in range(0, self.rows) if r not in pivot_rows], self.rows)
 
-        return result
+        return self._space('left_null', build)
 
     @property
     def rank(self):
         """ Returns a rank of a matrix """
 
-        return len(self.pivot_columns)
+        return len(self.pivots)
 
     @property
     def original(self):
@@ -50,129 +149,146 @@ class RRef(Matrix):
     def pivot_columns(self):
         """ Returns a list of indices of pivot columns """
 
-        return self._pivot_columns
+        return [column for row, column in self.pivots]
 
     @property
     def free_columns(self):
         """ Returns a list of indices of free columns """
 
+        self._eliminate()
         return self._free_columns
 
-print det(Matrix.from_rows([
-    [0, 0, 3, 1],
-    [-4, 2, 4, 1],
-    [0, 2, 1, -2],
-    [2, 1, 0, -2]
-]))
-
-
-'''print RRef(Matrix.from_rows([
-    [1, 1, 1, 1],
-    [1, 2, 3, 4],
-    [4, 3, 2, 1]
-]))
-
-print
-
-print RRef(Matrix.from_rows([
-    [1, 1, 1, 1],
-    [2, 1, 4, 3],
-    [3, 4, 1, 2]
-]))
-
-print
-
-print RRef(Matrix.from_rows([
-    [1, 1, 2, 3, 2],
-    [1, 1, 3, 1, 4]
-]))'''
-
-A = Matrix.from_rows([
-    [2, 1, 7, -7, 2],
-    [-3, 4, -5, -6, 3],
-    [1, 1, 4, -5, 2]
-])
-
-print 'Column space of A:'
-print column_space(A)
-print 'Null space of A:'
-print null_space(A)
-
-'''print RRef(Matrix.from_rows([
-    [2, 1, 7, -7, 2],
-    [-3, 4, -5, -6, 3],
-    [1, 1, 4, -5, 2]
-])).null_space'''
-
-'''matrices = [
-    [
-        [2, 3, 1, 8],
-        [4, 7, 5, 20],
-        [0, -2, 2, 0]
-    ],
-    [
-        [2, 1, 0, 0, 0],
-        [1, 2, 1, 0, 0],
-        [0, 1, 2, 1, 0],
-        [0, 0, 1, 2, 5]
-    ],
-    [
-        [4, 2, 8],
-        [5, 2, 4],
-        [2, 6, 2],
-        [3, 0, 8]
-    ],
-    [
-        [1, 2, 5],
-        [1, 3, 4]
-    ],
-    [
-        [1, -1, 4],
-        [1, 0, 5],
-        [1, 1, 9]
-    ],
-    [
-        [2, -1, 2],
-        [1, 2, 1],
-        [1, 1, 4]
-    ],
-    [
-        [2, -2, -1],
-        [-2, 2, 7],
-        [5, 3, -26]
-    ],
-    [
-        [1, 1, 2, 1],
-        [1, 1, 2, 3]
-    ],
-    [
-        [1, 1, 1]
+    @property
+    def rows(self):
+        """ Returns a total number of rows in the original matrix """
+
+        return self._original.rows
+
+    @property
+    def cols(self):
+        """ Returns a total number of columns in the original matrix """
+
+        return self._original.cols
+
+
+if __name__ == '__main__':
+    from algorithms import det, column_space, null_space, linear_combination, gram_schmidt, bilinear, quadratic
+
+    print det(Matrix.from_rows([
+        [0, 0, 3, 1],
+        [-4, 2, 4, 1],
+        [0, 2, 1, -2],
+        [2, 1, 0, -2]
+    ]))
+
+
+    '''print RRef(Matrix.from_rows([
+        [1, 1, 1, 1],
+        [1, 2, 3, 4],
+        [4, 3, 2, 1]
+    ]))
+
+    print
+
+    print RRef(Matrix.from_rows([
+        [1, 1, 1, 1],
+        [2, 1, 4, 3],
+        [3, 4, 1, 2]
+    ]))
+
+    print
+
+    print RRef(Matrix.from_rows([
+        [1, 1, 2, 3, 2],
+        [1, 1, 3, 1, 4]
+    ]))'''
+
+    A = Matrix.from_rows([
+        [2, 1, 7, -7, 2],
+        [-3, 4, -5, -6, 3],
+        [1, 1, 4, -5, 2]
+    ])
+
+    print 'Column space of A:'
+    print column_space(A)
+    print 'Null space of A:'
+    print null_space(A)
+
+    '''print RRef(Matrix.from_rows([
+        [2, 1, 7, -7, 2],
+        [-3, 4, -5, -6, 3],
+        [1, 1, 4, -5, 2]
+    ])).null_space'''
+
+    '''matrices = [
+        [
+            [2, 3, 1, 8],
+            [4, 7, 5, 20],
+            [0, -2, 2, 0]
+        ],
+        [
+            [2, 1, 0, 0, 0],
+            [1, 2, 1, 0, 0],
+            [0, 1, 2, 1, 0],
+            [0, 0, 1, 2, 5]
+        ],
+        [
+            [4, 2, 8],
+            [5, 2, 4],
+            [2, 6, 2],
+            [3, 0, 8]
+        ],
+        [
+            [1, 2, 5],
+            [1, 3, 4]
+        ],
+        [
+            [1, -1, 4],
+            [1, 0, 5],
+            [1, 1, 9]
+        ],
+        [
+            [2, -1, 2],
+            [1, 2, 1],
+            [1, 1, 4]
+        ],
+        [
+            [2, -2, -1],
+            [-2, 2, 7],
+            [5, 3, -26]
+        ],
+        [
+            [1, 1, 2, 1],
+            [1, 1, 2, 3]
+        ],
+        [
+            [1, 1, 1]
+        ]
     ]
-]
 
 
-for i in range(0, len(matrices)):
-    m = Matrix.from_values(matrices[i])
-    r = RRef(m)
+    for i in range(0, len(matrices)):
+        m = Matrix.from_rows(matrices[i])
+        r = RRef(m)
 
-    for j, row in enumerate(m):
-        print row, '\t', r[j]
-    print'''
+        for j, row in enumerate(m):
+            print row, '\t', r.matrix[j]
+        print'''
 
-print 'Linear combination: ', linear_combination([Vector(1.0, 0.0), Vector(0.0, 1.0)], [5.0, -2.0])
+    print 'Linear combination: ', linear_combination([Vector(1.0, 0.0), Vector(0.0, 1.0)], [5.0, -2.0])
 
-print 'Ortho basis:\n', Matrix.from_column_vectors(gram_schmidt([
-    Vector(1, 2, -3),
-    Vector(1, 0, -5),
-    Vector(-2, 1, 1)
-], normalize=False))
+    print 'Ortho basis:\n', Matrix.from_column_vectors(gram_schmidt([
+        Vector(1, 2, -3),
+        Vector(1, 0, -5),
+        Vector(-2, 1, 1)
+    ], normalize=False))
 
-print 'Bilinear form: ', bilinear(Matrix.from_columns([
-    [1, 0],
-    [0, 1]
-]), Vector(2, 2), Vector(3, 3))
+    print 'Bilinear form: ', bilinear(Matrix.from_columns([
+        [1, 0],
+        [0, 1]
+    ]), Vector(2, 2), Vector(3, 3))
 
-print 'Quadratic form: ', quadratic(Matrix.from_columns([
-    [1, 0],
-    [0, 1]
-]), Vector(2, 2))
+    print 'Quadratic form: ', quadratic(Matrix.from_columns([
+        [1, 0],
+        [0, 1]
+    ]), Vector(2, 2))
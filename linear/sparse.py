@@ -0,0 +1,249 @@
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from heapq import heappush, heappop
+
+import storage
+from matrix import Matrix, MatrixError
+from vector import Vector
+
+
+class SparseMatrix(object):
+    """ Sparse matrix stored in a compressed sparse row (CSR) format """
+
+    def __init__(self, rows, cols, entries=()):
+        """ Constructs a sparse matrix from (row, column, value) triplets, duplicate entries are summed """
+
+        accumulated = defaultdict(float)
+
+        for i, j, v in entries:
+            assert 0 <= i < rows
+            assert 0 <= j < cols
+            accumulated[i, j] += v
+
+        self._rows = rows
+        self._cols = cols
+        self._build(sorted((i, j, v) for (i, j), v in accumulated.iteritems() if v != 0.0))
+
+    def __repr__(self):
+        """ Converts a sparse matrix to a string value """
+
+        return '\n'.join('(%d, %d) %r' % entry for entry in self.entries())
+
+    def __mul__(self, other):
+        """ Multiplies a sparse matrix with a dense vector, a dense matrix or other sparse matrix """
+
+        if isinstance(other, Vector):
+            if other.dim != self.cols:
+                raise MatrixError("Matrix and vector dimensions do not match")
+
+            x = other.values()
+            indptr, indices, values = self._indptr, self._indices, self._values
+
+            return Vector([sum(values[k] * x[indices[k]] for k in xrange(indptr[i], indptr[i + 1]))
+                           for i in xrange(self.rows)])
+
+        if self.cols != other.rows:
+            raise MatrixError("Matrix dimensions does not match")
+
+        if isinstance(other, Matrix):
+            return Matrix.from_column_vectors([self * other.column(j) for j in range(other.cols)])
+
+        assert isinstance(other, SparseMatrix)
+
+        # Row by row accumulation, only the non-zero entries of both operands are visited
+        entries = []
+
+        for i in xrange(self.rows):
+            row = defaultdict(float)
+
+            for k, a in self.row(i):
+                for j, b in other.row(k):
+                    row[j] += a * b
+
+            entries.extend((i, j, v) for j, v in row.iteritems())
+
+        return SparseMatrix(self.rows, other.cols, entries)
+
+    def _build(self, entries):
+        """ Fills the CSR arrays from (row, column, value) triplets sorted by row and column """
+
+        self._indptr = array('l', [0]) * (self._rows + 1)
+        self._indices = array('l', [j for i, j, v in entries])
+        self._values = storage.from_values([v for i, j, v in entries])
+
+        for i, j, v in entries:
+            self._indptr[i + 1] += 1
+
+        for i in xrange(self._rows):
+            self._indptr[i + 1] += self._indptr[i]
+
+    def get(self, row, column):
+        """ Returns a value at specified row and column """
+
+        start, end = self._indptr[row], self._indptr[row + 1]
+        k = bisect_left(self._indices, column, start, end)
+
+        return self._values[k] if k < end and self._indices[k] == column else 0.0
+
+    def row(self, index):
+        """ Returns a list of (column, value) pairs of non-zero entries in a row """
+
+        start, end = self._indptr[index], self._indptr[index + 1]
+        return zip(self._indices[start:end], self._values[start:end])
+
+    def entries(self):
+        """ Returns an iterator over (row, column, value) triplets of non-zero entries """
+
+        for i in xrange(self.rows):
+            for j, v in self.row(i):
+                yield i, j, v
+
+    def transposed(self):
+        """ Returns a transpose of this matrix """
+
+        return SparseMatrix(self.cols, self.rows, ((j, i, v) for i, j, v in self.entries()))
+
+    def to_dense(self):
+        """ Converts this matrix to a dense one """
+
+        result = Matrix(self.rows, self.cols)
+        data = result.buffer
+
+        for i, j, v in self.entries():
+            data[i * self.cols + j] = v
+
+        return result
+
+    @property
+    def nnz(self):
+        """ Returns a total number of stored non-zero entries """
+
+        return len(self._values)
+
+    @property
+    def rows(self):
+        """ Returns a total number of rows in this matrix """
+
+        return self._rows
+
+    @property
+    def cols(self):
+        """ Returns a total number of columns in this matrix """
+
+        return self._cols
+
+    @property
+    def dimensions(self):
+        """ Returns the matrix dimensions as a tuple """
+
+        return self.rows, self.cols
+
+    @classmethod
+    def from_coo(cls, rows, cols, row_indices, col_indices, values):
+        """ Constructs a sparse matrix from coordinate format arrays """
+
+        assert len(row_indices) == len(col_indices) == len(values)
+        return SparseMatrix(rows, cols, zip(row_indices, col_indices, values))
+
+    @classmethod
+    def from_dense(cls, matrix, tolerance=0.0):
+        """ Constructs a sparse matrix from the entries of a dense matrix larger than tolerance """
+
+        entries = []
+
+        for i, row in enumerate(matrix):
+            entries.extend((i, j, v) for j, v in enumerate(row.values()) if abs(v) > tolerance)
+
+        return SparseMatrix(matrix.rows, matrix.cols, entries)
+
+
+def sparse_gauss_elimination(matrix, tolerance=1e-09, threshold=0.1):
+    """ Reduces a sparse matrix with Gauss-Jordan elimination and Markowitz pivot ordering.
+
+        Returns a reduced matrix, a list of (row, column) pivots and a list of free columns. Pivot
+        rows are sorted by the pivot column, but the pivot choice follows the fill-reducing order,
+        so the pivot columns may differ from those chosen by a dense elimination.
+    """
+
+    rows = [dict(matrix.row(i)) for i in range(matrix.rows)]
+    column_rows = defaultdict(set)
+
+    for i, row in enumerate(rows):
+        for j in row:
+            column_rows[j].add(i)
+
+    # Rows are visited in the order of the smallest number of non-zeros, stale heap entries are skipped
+    queue = [(len(row), i) for i, row in enumerate(rows) if row]
+    queue.sort()
+    active = set(range(matrix.rows))
+    pivots = []
+
+    while queue:
+        degree, p = heappop(queue)
+
+        if p not in active or degree != len(rows[p]):
+            continue
+
+        pivot_row = rows[p]
+        largest = max(abs(v) for v in pivot_row.itervalues())
+
+        if largest <= tolerance:
+            continue
+
+        # Among the numerically acceptable entries take the one in the column touching the fewest rows
+        column = min((j for j, v in pivot_row.iteritems() if abs(v) >= threshold * largest),
+                     key=lambda j: (len(column_rows[j]), j))
+
+        scale = 1.0 / pivot_row[column]
+        for j in pivot_row:
+            pivot_row[j] *= scale
+        pivot_row[column] = 1.0
+
+        active.discard(p)
+        pivots.append((p, column))
+
+        for r in list(column_rows[column]):
+            if r == p:
+                continue
+
+            row = rows[r]
+            factor = row[column]
+
+            for j, v in pivot_row.iteritems():
+                value = row.get(j, 0.0) - factor * v
+
+                if j == column or abs(value) <= tolerance:
+                    row.pop(j, None)
+                    column_rows[j].discard(r)
+                else:
+                    row[j] = value
+                    column_rows[j].add(r)
+
+            if r in active and row:
+                heappush(queue, (len(row), r))
+
+    pivots.sort(key=lambda pivot: pivot[1])
+    order = [p for p, column in pivots] + [i for i in range(matrix.rows) if i in active]
+
+    entries = [(i, j, v) for i, r in enumerate(order) for j, v in rows[r].iteritems()]
+    pivot_columns = set(column for p, column in pivots)
+    free = [j for j in range(matrix.cols) if j not in pivot_columns]
+
+    return SparseMatrix(matrix.rows, matrix.cols, entries), [(i, c) for i, (p, c) in enumerate(pivots)], free
+
+
+def sparse_null_space(matrix, tolerance=1e-09):
+    """ Returns a null space of a sparse matrix as a sparse matrix with basis vectors as columns """
+
+    r_ref, pivots, free_columns = sparse_gauss_elimination(matrix, tolerance)
+    free_index = dict((column, j) for j, column in enumerate(free_columns))
+
+    entries = [(column, j, 1.0) for j, column in enumerate(free_columns)]
+
+    for pivot_row, pivot_column in pivots:
+        for column, v in r_ref.row(pivot_row):
+            if column != pivot_column:
+                entries.append((pivot_column, free_index[column], -v))
+
+    return SparseMatrix(matrix.cols, len(free_columns), entries)
@@ -0,0 +1,97 @@
+import ctypes
+from array import array
+
+
+TYPECODE = 'd'
+ITEMSIZE = array(TYPECODE).itemsize
+
+
+def allocate(size, element=float):
+    """ Allocates a zero filled contiguous buffer of a given size.
+
+        Floats are stored in a typed array, any other element type, like Fraction or int, in a list.
+    """
+
+    if element is float:
+        return array(TYPECODE, [0.0]) * size
+
+    return [element(0)] * size
+
+
+def allocate_like(buffer, size):
+    """ Allocates a zero filled contiguous buffer that stores the same kind of elements as a given one """
+
+    return [0] * size if is_exact(buffer) else allocate(size)
+
+
+def from_values(values, element=float):
+    """ Constructs a contiguous buffer from a sequence of values """
+
+    if element is float:
+        return array(TYPECODE, values)
+
+    return [element(v) for v in values]
+
+
+def is_exact(buffer):
+    """ Returns true if a buffer stores exact elements instead of floats """
+
+    return isinstance(buffer, list)
+
+
+def is_mapped(buffer):
+    """ Returns true if a buffer is a ctypes array of doubles, like a memory-mapped or a shared memory one """
+
+    return isinstance(buffer, ctypes.Array)
+
+
+def compatible(buffer, values):
+    """ Converts a sequence of values to a type that can be slice-assigned into a given buffer """
+
+    if isinstance(buffer, array):
+        if isinstance(values, array) and values.typecode == buffer.typecode:
+            return values
+
+        return array(buffer.typecode, values)
+
+    return list(values)
+
+
+def strided_slice(buffer, offset, count, stride):
+    """ Returns a copy of count buffer elements starting at offset and separated by stride """
+
+    if is_mapped(buffer):
+        # Copy a contiguous range of a mapped buffer with a single memory copy
+        if stride == 1:
+            assert offset + count <= len(buffer)
+            return from_bytes(ctypes.string_at(ctypes.addressof(buffer) + offset * ITEMSIZE, count * ITEMSIZE))
+
+        return array(TYPECODE, buffer[offset:offset + count * stride:stride])
+
+    if stride == 1:
+        return buffer[offset:offset + count]
+
+    return buffer[offset:offset + count * stride:stride]
+
+
+def strided_assign(buffer, offset, count, stride, values):
+    """ Writes count values to a buffer starting at offset and separated by stride """
+
+    if stride == 1 and is_mapped(buffer):
+        values = values if isinstance(values, array) and values.typecode == TYPECODE else array(TYPECODE, values)
+
+        assert len(values) == count and offset + count <= len(buffer)
+        ctypes.memmove(ctypes.addressof(buffer) + offset * ITEMSIZE, values.buffer_info()[0], count * ITEMSIZE)
+    elif stride == 1:
+        buffer[offset:offset + count] = compatible(buffer, values)
+    else:
+        buffer[offset:offset + count * stride:stride] = compatible(buffer, values)
+
+
+def from_bytes(raw):
+    """ Constructs a contiguous buffer from a string of machine values """
+
+    result = array(TYPECODE)
+    result.fromstring(raw)
+
+    return result
@@ -0,0 +1,210 @@
+import os
+import tempfile
+from itertools import imap, izip
+from operator import add, mul, sub
+
+import disk
+import multiply
+import storage
+from matrix import Matrix, MatrixError
+
+
+# Default number of bytes of tile payload an out-of-core algorithm keeps in memory at once
+MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Bytes a float takes in a Python list, a pointer and a float object, against 8 bytes in a typed array
+LIST_ITEMSIZE = 32
+
+# Array tiles worth of memory resident while a product tile is accumulated: both operands packed by the multiply
+# kernel into lists, a product and two accumulators
+GEMM_TILES = 2 * LIST_ITEMSIZE // storage.ITEMSIZE + 3
+
+# Array tiles worth of memory resident while a trailing tile is updated: both packed operands, a lower tile,
+# a product, a target tile and its update
+UPDATE_TILES = 2 * LIST_ITEMSIZE // storage.ITEMSIZE + 4
+
+
+def tile_size(memory_budget=MEMORY_BUDGET, tiles=3):
+    """ Returns the largest square tile size, so that a given number of tiles fits the memory budget.
+
+        The tiles are typed arrays of 8 byte elements, a tile packed into a list counts as several of them.
+    """
+
+    size = int((memory_budget // (tiles * storage.ITEMSIZE)) ** 0.5)
+    return max(size, 1)
+
+
+def create(path, rows, cols):
+    """ Creates a zero filled matrix memory-mapped from a file, an unnamed temporary one if the path is None """
+
+    if path is None:
+        handle, temporary = tempfile.mkstemp(suffix='.matrix')
+        os.close(handle)
+
+        try:
+            return create(temporary, rows, cols)
+        finally:
+            # The mapping keeps the file contents until the matrix is released, so the name can be removed now
+            os.remove(temporary)
+
+    disk.create(path, rows, cols)
+    return Matrix.open_mmap(path)
+
+
+def copy(matrix, path=None, memory_budget=MEMORY_BUDGET):
+    """ Copies a matrix to a new file band by band, so it is never fully resident in memory """
+
+    result = create(path, matrix.rows, matrix.cols)
+    band = max(memory_budget // (storage.ITEMSIZE * max(matrix.cols, 1)), 1)
+
+    for row, block in matrix.row_blocks(band):
+        result.block(row, 0, block.rows, block.cols).set(block)
+
+    return result
+
+
+def gemm(a, b, path=None, memory_budget=MEMORY_BUDGET):
+    """ Multiplies two disk-backed matrices tile by tile and writes the product tiles to a file.
+
+        Only a tile of each operand and an accumulator tile are loaded at a time, so the operands and the
+        product may be far larger than the memory budget.
+    """
+
+    if a.cols != b.rows:
+        raise MatrixError("Matrix dimensions does not match")
+
+    result = create(path, a.rows, b.cols)
+    size = tile_size(memory_budget, GEMM_TILES)
+
+    for i in xrange(0, a.rows, size):
+        rows = min(size, a.rows - i)
+
+        for j in xrange(0, b.cols, size):
+            cols = min(size, b.cols - j)
+            accumulator = None
+
+            for k in xrange(0, a.cols, size):
+                depth = min(size, a.cols - k)
+                # The kernel packs the operand blocks itself, copying them first would keep two more tiles resident
+                product = multiply.gemm(a.block(i, k, rows, depth), b.block(k, j, depth, cols))
+                accumulator = product if accumulator is None else storage.from_values(imap(add, accumulator, product))
+
+            if accumulator is not None:
+                result.block(i, j, rows, cols).set(Matrix.from_buffer(accumulator, rows, cols))
+
+    return result
+
+
+def lu(matrix, memory_budget=MEMORY_BUDGET, tolerance=1e-09):
+    """ Factorizes a disk-backed square matrix in place with a blocked right-looking LU with partial pivoting.
+
+        The matrix is overwritten with a packed factorization, the strict lower triangle holds the unit lower
+        factor and the upper triangle holds the upper factor. Returns a row permutation and its sign.
+    """
+
+    if matrix.rows != matrix.cols:
+        raise MatrixError("LU factorization requires a square matrix")
+
+    n = matrix.rows
+    size = tile_size(memory_budget, UPDATE_TILES)
+
+    # A panel spans all rows below the diagonal, so its width is limited by the matrix height too
+    width = max(min(size, memory_budget // (storage.ITEMSIZE * max(n, 1))), 1)
+
+    permutation = range(n)
+    sign = 1
+
+    for k in xrange(0, n, width):
+        b = min(width, n - k)
+
+        # Factorize a tall panel in memory and apply its row exchanges to the whole matrix
+        panel = [row.values() for row in matrix.block(k, k, n - k, b)]
+        swaps = _factorize_panel(panel, tolerance)
+
+        for step, pivot in enumerate(swaps):
+            if pivot != step:
+                matrix.swap_rows(k + step, k + pivot)
+                permutation[k + step], permutation[k + pivot] = permutation[k + pivot], permutation[k + step]
+                sign = -sign
+
+        _store_rows(matrix.block(k, k, n - k, b), panel)
+
+        if k + b == n:
+            break
+
+        # Solve for the block row of the upper factor, L11 * U12 = A12, one column tile at a time
+        for j in xrange(k + b, n, size):
+            cols = min(size, n - j)
+            target = matrix.block(k, j, b, cols)
+            rows = [row.values() for row in target]
+
+            for r in xrange(1, b):
+                for s in xrange(0, r):
+                    factor = panel[r][s]
+
+                    if factor != 0:
+                        rows[r] = storage.compatible(rows[r], [x - factor * v for x, v in izip(rows[r], rows[s])])
+
+            _store_rows(target, rows)
+
+        # Update the trailing submatrix tile by tile, A22 -= L21 * U12
+        for i in xrange(k + b, n, size):
+            rows = min(size, n - i)
+            lower = matrix.block(i, k, rows, b).copy()
+
+            for j in xrange(k + b, n, size):
+                cols = min(size, n - j)
+                target = matrix.block(i, j, rows, cols)
+                product = multiply.gemm(lower, matrix.block(k, j, b, cols))
+                target.set(Matrix.from_buffer(storage.from_values(imap(sub, target.values(), product)), rows, cols))
+
+    return permutation, sign
+
+
+def det(matrix, path=None, memory_budget=MEMORY_BUDGET):
+    """ Calculates a determinant of a disk-backed matrix with a blocked LU of its copy """
+
+    factorized = copy(matrix, path, memory_budget)
+    permutation, sign = lu(factorized, memory_budget)
+
+    return reduce(mul, (factorized[i][i] for i in xrange(factorized.rows)), float(sign))
+
+
+def _store_rows(block, rows):
+    """ Writes row buffers to the rows of a block one by one, without joining them into another matrix first """
+
+    for i, row in enumerate(rows):
+        block[i].assign(row)
+
+
+def _factorize_panel(panel, tolerance):
+    """ Runs an unblocked LU with partial pivoting on a list of panel row buffers, returns a pivot row of each step """
+
+    width = len(panel[0]) if panel else 0
+    swaps = []
+
+    for step in xrange(0, min(width, len(panel))):
+        pivot = max(xrange(step, len(panel)), key=lambda i: abs(panel[i][step]))
+        swaps.append(pivot)
+
+        if pivot != step:
+            panel[step], panel[pivot] = panel[pivot], panel[step]
+
+        coefficient = panel[step][step]
+
+        # A zero column leaves nothing to eliminate, the same as inplace_upper_triangular does
+        if abs(coefficient) <= tolerance:
+            continue
+
+        pivot_row = panel[step]
+
+        for idx in xrange(step + 1, len(panel)):
+            row = panel[idx]
+            factor = row[step] / coefficient
+            row[step] = factor
+
+            if factor != 0:
+                updated = [x - factor * v for x, v in izip(row[step + 1:], pivot_row[step + 1:])]
+                row[step + 1:] = storage.compatible(row, updated)
+
+    return swaps
@@ -1,16 +1,70 @@
 from math import sqrt
+from numbers import Number
+from fractions import Fraction
+from operator import mul
+
+import storage
+
+
+# Unrolled kernels for short vectors, keyed by a dimension
+_ADD = {
+    2: lambda a, b: (a[0] + b[0], a[1] + b[1]),
+    3: lambda a, b: (a[0] + b[0], a[1] + b[1], a[2] + b[2]),
+    4: lambda a, b: (a[0] + b[0], a[1] + b[1], a[2] + b[2], a[3] + b[3]),
+}
+
+_SUB = {
+    2: lambda a, b: (a[0] - b[0], a[1] - b[1]),
+    3: lambda a, b: (a[0] - b[0], a[1] - b[1], a[2] - b[2]),
+    4: lambda a, b: (a[0] - b[0], a[1] - b[1], a[2] - b[2], a[3] - b[3]),
+}
+
+_DOT = {
+    2: lambda a, b: a[0] * b[0] + a[1] * b[1],
+    3: lambda a, b: a[0] * b[0] + a[1] * b[1] + a[2] * b[2],
+    4: lambda a, b: a[0] * b[0] + a[1] * b[1] + a[2] * b[2] + a[3] * b[3],
+}
+
+_SCALE = {
+    2: lambda a, s: (a[0] * s, a[1] * s),
+    3: lambda a, s: (a[0] * s, a[1] * s, a[2] * s),
+    4: lambda a, s: (a[0] * s, a[1] * s, a[2] * s, a[3] * s),
+}
+
+# Built-in scalar types are checked before the much slower abstract Number check
+_SCALARS = (float, int, long)
+
+# Sequences a constructor takes as a single argument holding all the elements
+_SEQUENCES = (list, tuple, storage.array)
+
+# Constructors of float buffers bound once, short vectors are created often enough for lookups to show
+_array = storage.array
+_TYPECODE = storage.TYPECODE
 
 
 class Vector(object):
-    def __init__(self, *args):
-        """ Constructs a new Vector instance from input values """
+    __slots__ = ('_data', '_offset', '_stride', '_dim', '_view')
 
-        n = len(args)
+    def __init__(self, *args, **kwargs):
+        """ Constructs a new Vector instance from input values, an element keyword selects an exact type """
 
-        if n == 1 and isinstance(args[0], (list, tuple)):
+        if len(args) == 1 and isinstance(args[0], _SEQUENCES):
             args = args[0]
 
-        self._items = [float(v) for v in args]
+        if not kwargs or kwargs.get('element', float) is float:
+            # A typed array converts numbers itself, only other values go through an explicit float() call
+            try:
+                data = _array(_TYPECODE, args)
+            except TypeError:
+                data = storage.from_values([float(v) for v in args])
+        else:
+            data = storage.from_values(args, kwargs['element'])
+
+        self._data = data
+        self._offset = 0
+        self._stride = 1
+        self._dim = len(data)
+        self._view = False
 
     def __eq__(self, other):
         """ Tests the self and other for an equality """
@@ -21,49 +75,95 @@ class Vector(object):
         """ Multiplies a vector by a scalar or computes the dot product of two vectors """
 
         if isinstance(other, Vector):
-            return sum(a * b for a, b in zip(self, other))
-        elif isinstance(other, (int, float)):
+            a, b = self._packed(), other._packed()
+            kernel = _DOT.get(self._dim) if other._dim == self._dim else None
+
+            return kernel(a, b) if kernel is not None else sum(map(mul, a, b))
+        elif isinstance(other, _SCALARS) or isinstance(other, Number):
             return self.__rmul__(other)
 
+        return NotImplemented
+
     def __rmul__(self, other):
         """ Multiplies a vector by a scalar value """
 
-        assert isinstance(other, (int, float))
+        assert isinstance(other, _SCALARS) or isinstance(other, Number)
+
+        a = self._packed()
+        kernel = _SCALE.get(self._dim)
 
-        product = tuple(a * other for a in self)
-        return Vector(*product)
+        return self._like(kernel(a, other) if kernel is not None else [v * other for v in a])
 
     def __div__(self, other):
         """ Divides a vector by a scalar value """
 
         assert other != 0.0
-        return self.__rmul__(1.0 / other)
+        return self.__rmul__(self._reciprocal(other))
 
     def __add__(self, other):
         """ Returns the vector addition of self and other """
 
-        added = tuple(a + b for a, b in zip(self, other))
-        return Vector(*added)
+        a, b = self._packed(), _operand(other)
+
+        # Let other operands, like lazy expressions, handle the addition
+        if b is None:
+            return NotImplemented
+
+        kernel = _ADD.get(self._dim) if len(b) == self._dim else None
+
+        return self._like(kernel(a, b) if kernel is not None else [x + y for x, y in zip(a, b)])
 
     def __sub__(self, other):
         """ Returns the vector difference of self and other """
 
-        subbed = tuple(a - b for a, b in zip(self, other))
-        return Vector(*subbed)
+        a, b = self._packed(), _operand(other)
+
+        # Let other operands, like lazy expressions, handle the subtraction
+        if b is None:
+            return NotImplemented
+
+        kernel = _SUB.get(self._dim) if len(b) == self._dim else None
+
+        return self._like(kernel(a, b) if kernel is not None else [x - y for x, y in zip(a, b)])
+
+    def __iadd__(self, other):
+        """ Adds other vector to this one in place """
+
+        return self.axpy(1, other)
+
+    def __isub__(self, other):
+        """ Subtracts other vector from this one in place """
+
+        return self.axpy(-1, other)
+
+    def __imul__(self, other):
+        """ Multiplies this vector by a scalar value in place """
+
+        assert isinstance(other, Number)
+
+        self.assign([a * other for a in self.values()])
+        return self
+
+    def __idiv__(self, other):
+        """ Divides this vector by a scalar value in place """
+
+        assert other != 0.0
+        return self.__imul__(self._reciprocal(other))
+
+    __truediv__ = __div__
+    __itruediv__ = __idiv__
 
     def __setitem__(self, index, value):
         """ Sets a vector scalar value at specified index """
 
-        assert index >= 0
-        assert index < self.dim
-        self.items[index] = value
+        assert 0 <= index < self._dim
+        self._data[self._offset + index * self._stride] = value
 
     def __getitem__(self, index):
         """ Returns a vector scalar value at specified index """
 
-        assert index >= 0
-        assert index < self.dim
-        return self.items[index]
+        assert 0 <= index < self._dim
+        return self._data[self._offset + index * self._stride]
 
     def __repr__(self):
         """ Converts a vector to a string value """
@@ -73,7 +173,7 @@ class Vector(object):
     def __iter__(self):
         """ Returns a vector value iterator """
 
-        return self.items.__iter__()
+        return iter(self.values())
 
     def project(self, other):
         """ Projects other vector onto this one and returns a projection and it's length """
@@ -89,24 +189,105 @@ class Vector(object):
     def copy(self):
         """ Returns a copy of this vector """
 
-        return Vector(self.items)
+        return Vector.from_buffer(self.values())
+
+    def _like(self, values):
+        """ Constructs a new vector that stores values with the same element type as this one """
+
+        data = self._data
+
+        # Float results skip the buffer type dispatch, the kernels return tuples a typed array takes as is
+        if type(data) is _array:
+            return _trusted(_array(data.typecode, values))
+
+        return _trusted(storage.compatible(data, values))
+
+    def _packed(self):
+        """ Returns the vector elements as an indexable sequence, the buffer itself when the vector owns all of it """
+
+        if self._stride == 1 and self._offset == 0 and len(self._data) == self._dim:
+            return self._data
+
+        return self.values()
+
+    def _reciprocal(self, value):
+        """ Returns a reciprocal of a scalar value, an exact one for exact vectors """
+
+        return Fraction(1) / value if self.is_exact else 1.0 / value
+
+    def values(self, start=0):
+        """ Returns a copy of the vector elements starting at a given index as a contiguous buffer """
+
+        return storage.strided_slice(self._data, self._offset + start * self._stride, self._dim - start, self._stride)
+
+    def assign(self, values, start=0):
+        """ Overwrites the vector elements starting at a given index with values from a given sequence """
+
+        storage.strided_assign(self._data, self._offset + start * self._stride, self._dim - start, self._stride, values)
+
+    def axpy(self, alpha, other, start=0):
+        """ Adds other vector scaled by alpha to this one in place, leaving the first start elements untouched """
+
+        assert self.dim == other.dim
+
+        self.assign([a + alpha * b for a, b in zip(self.values(start), other.values(start))], start)
+        return self
 
     def append(self, value):
         """ Appends a new value to this vector with an increase of vector's dimensionality """
 
-        self._items.append(float(value))
+        assert not self._view, "Cannot append to a view of a shared buffer"
+
+        self._data.append(value if self.is_exact else float(value))
+        self._dim += 1
 
     @property
     def dim(self):
         """ Returns a vector dimensions """
 
-        return len(self.items)
+        return self._dim
 
     @property
     def items(self):
-        """ Returns the vector elements """
+        """ Returns the vector elements as a list """
+
+        return list(self.values())
+
+    @property
+    def is_exact(self):
+        """ Returns true if this vector stores exact elements instead of floats """
+
+        return storage.is_exact(self._data)
+
+    @property
+    def element(self):
+        """ Returns a type new elements of this vector are created with """
+
+        return Fraction if self.is_exact else float
+
+    @property
+    def buffer(self):
+        """ Returns the underlying storage buffer """
+
+        return self._data
+
+    @property
+    def offset(self):
+        """ Returns an offset of the first vector element in the storage buffer """
 
-        return self._items
+        return self._offset
+
+    @property
+    def stride(self):
+        """ Returns a distance between adjacent vector elements in the storage buffer """
+
+        return self._stride
+
+    @property
+    def is_view(self):
+        """ Returns true if this vector references a buffer owned by other object """
+
+        return self._view
 
     @property
     def length(self):
@@ -120,6 +301,47 @@ class Vector(object):
 
         return next((i for i, value in enumerate(self) if value), None)
 
+    @classmethod
+    def from_buffer(cls, data):
+        """ Constructs a vector that owns a given contiguous buffer without copying it """
+
+        return cls.view(data, 0, len(data), 1, False)
+
+    @classmethod
+    def view(cls, data, offset, dim, stride=1, view=True):
+        """ Constructs a vector that references dim elements of a shared buffer without copying them """
+
+        result = cls.__new__(cls)
+        result._data = data
+        result._offset = offset
+        result._stride = stride
+        result._dim = dim
+        result._view = view
+
+        return result
+
+
+def _trusted(data):
+    """ Constructs a vector that owns a given contiguous buffer, skipping the argument handling of a constructor """
+
+    result = Vector.__new__(Vector)
+    result._data = data
+    result._offset = 0
+    result._stride = 1
+    result._dim = len(data)
+    result._view = False
+
+    return result
+
+
+def _operand(other):
+    """ Returns elements of a vector operand as an indexable sequence, or None for other types """
+
+    if isinstance(other, Vector):
+        return other._packed()
+
+    return other if isinstance(other, _SEQUENCES) else None
+
 
 assert Vector(1).dim == 1
 assert Vector(1, 2).dim == 2
@@ -1,3 +1,5 @@
 #import gauss
 #import gramm_schmidt
-import least_squares
\ No newline at end of file
+import least_squares
+
+print least_squares.solve(least_squares.A)
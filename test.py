@@ -1,6 +1,23 @@
-from math import log, cos, sin, sqrt
+import os
+import random
+import tempfile
+from array import array
+from fractions import Fraction
+from itertools import imap
+from math import atan, log, cos, pi, sin, sqrt
+from multiprocessing.pool import Pool, ThreadPool
 
-from calculus import euler_approximation, newton_solver, Polynomial, fixed_point
+from calculus import euler_approximation, newton_solver, Polynomial, fixed_point, find_roots, newton_many
+from calculus import integrate, gauss_kronrod, romberg, iterate, FixedPointError
+from calculus.polynomial import derivative_operator, interpolate
+from linear import Matrix, Vector, LU, RRef, SparseMatrix, lazy, instrumentation, qr, storage, tiled
+from linear.algorithms import det, gauss_elimination, gram_schmidt, linear_combination, quadratic, rank, transposed
+from linear.algorithms import FULL, ROOK
+from linear.batch import det_many, rref_many
+from linear.disk import DiskFormatError
+from linear.eigen import symmetric_eigen, definiteness, POSITIVE_DEFINITE, POSITIVE_SEMIDEFINITE
+from linear.sparse import sparse_null_space
+from least_squares import LeastSquares
 
 
 def f0(x):
@@ -39,3 +56,290 @@ test_x2_euler(50, 10)
 test_ln_euler(20, 10)
 test_sin_euler(0.5, 33)
 test_sin_euler(10, 100)
+
+
+class LazyExecutor(object):
+    """ An executor with a lazy map, tiles are only computed when the results are consumed """
+
+    def map(self, f, tasks):
+        return imap(f, tasks)
+
+
+def random_matrix(rows, cols):
+    return Matrix.from_rows([[random.uniform(-1.0, 1.0) for j in range(cols)] for i in range(rows)])
+
+
+def max_difference(a, b):
+    return max(abs(x - y) for x, y in zip(a.values(), b.values()))
+
+
+# A factorization solves systems, and gives the determinant and the inverse of the factorized matrix
+a = random_matrix(6, 6)
+lu = LU(a)
+rhs = Vector([random.uniform(-1.0, 1.0) for i in range(6)])
+
+assert max(abs(x - y) for x, y in zip(a * lu.solve(rhs), rhs)) < 1e-9
+assert abs(lu.det() - det(a)) <= 1e-9 * abs(det(a))
+assert max_difference(a * lu.inverse(), Matrix.identity(6)) < 1e-9
+
+# In-place arithmetic updates a vector without allocating a new one
+v = Vector(1, 2, 3)
+alias = v
+v += Vector(1, 1, 1)
+v -= Vector(0, 1, 0)
+v *= 2
+
+assert alias is v and v == Vector(4, 4, 8)
+assert v.axpy(0.5, Vector(2, 2, 2), 1) == Vector(4, 5, 9)
+
+# Sparse products match the dense ones, and a sparse null space is annihilated by its matrix
+dense = Matrix.from_rows([[1, 0, 2, 0], [0, 3, 0, 0], [2, 0, 4, 0]])
+sparse = SparseMatrix.from_dense(dense)
+
+assert sparse.nnz == 5
+assert sparse * Vector(1, 2, 3, 4) == dense * Vector(1, 2, 3, 4)
+assert max_difference((sparse * sparse.transposed()).to_dense(), dense * transposed(dense)) == 0.0
+assert sparse_null_space(sparse).cols == 2
+assert all(v == 0.0 for v in (sparse * sparse_null_space(sparse).to_dense()).values())
+
+# Batched evaluation matches evaluating each input alone and keeps the container type
+cubic = Polynomial(2, -3, 0, 5)
+inputs = [random.uniform(-2.0, 2.0) for i in range(10)]
+
+assert cubic.evaluate_many(inputs) == [cubic(x) for x in inputs]
+assert list(cubic.evaluate_many(array('d', inputs))) == [cubic(x) for x in inputs]
+
+# Derivatives are computed directly, the cached operator gives the same coefficients
+assert cubic.derivative == Polynomial(6, -6, 0) and cubic.nth_derivative(2) == Polynomial(12, -6)
+assert cubic.derivative.coefficients == list(derivative_operator(3) * Vector(cubic.coefficients))[1:]
+
+# Newton iterations from many starts and the deflation finder both reach the roots of (x - 1)(x - 2)(x - 3)
+roots = Polynomial(1, -6, 11, -6)
+
+assert all(r.status == 'converged' for r in newton_many(roots, [0.0, 1.6, 10.0]))
+assert [round(r.root.real, 8) for r in newton_many(roots, [0.0, 10.0])] == [1.0, 3.0]
+assert sorted(round(complex(r.root).real, 8) for r in find_roots(roots)) == [1.0, 2.0, 3.0]
+
+# A batch of determinants and reduced forms computed in processes matches the serial ones
+batch = [random_matrix(5, 5) for i in range(6)]
+
+assert all(abs(x - det(m)) <= 1e-12 for x, m in zip(det_many(batch, processes=2), batch))
+assert all(max_difference(x[0], gauss_elimination(m)[0]) <= 1e-12 for x, m in zip(rref_many(batch, processes=2), batch))
+
+def is_zero(matrix, eps=1e-9):
+    return all(abs(v) <= eps for v in matrix.values())
+
+
+# A single elimination gives a rank, a null space and a left null space of a rank deficient matrix
+deficient = random_matrix(5, 3) * random_matrix(3, 6)
+r_ref = RRef(deficient)
+
+assert r_ref.rank == 3 and r_ref.column_space.cols == 3 and r_ref.row_space.cols == 3
+assert r_ref.null_space.cols == 3 and is_zero(deficient * r_ref.null_space)
+assert r_ref.left_null_space.cols == 2 and is_zero(transposed(deficient) * r_ref.left_null_space)
+
+# Full and rook pivoting span the same spaces as the partial one
+for pivoting in (FULL, ROOK):
+    r_ref = RRef(deficient, pivoting)
+
+    assert r_ref.rank == 3
+    assert r_ref.null_space.cols == 3 and is_zero(deficient * r_ref.null_space)
+    assert r_ref.left_null_space.cols == 2 and is_zero(transposed(deficient) * r_ref.left_null_space)
+
+# Exact matrices and vectors keep their elements exact through eliminations, solves, updates and combinations
+exact = Matrix.from_rows([[2, 1, 1], [4, 3, 3], [8, 7, 9]], Fraction)
+singular = Matrix.from_rows([[1, 2, 3], [2, 4, 6], [1, 0, 1]], Fraction)
+
+assert det(exact) == 4 and det(singular) == 0
+assert rank(exact) == 3 and rank(singular) == 2
+assert LU(exact).solve([1, 1, 1]) == Vector([1, -1, 0], element=Fraction)
+assert det_many([exact, singular], processes=2) == [4, 0]
+
+v = Vector([1, 2], element=Fraction)
+v -= Vector([Fraction(1, 3), 1], element=Fraction)
+v += Vector([Fraction(1, 6), 0], element=Fraction)
+assert v.is_exact and v.items == [Fraction(5, 6), 1]
+
+exact[0] = [Fraction(1, 3), 1, 1]
+assert exact[0][0] == Fraction(1, 3) and isinstance(exact[0][0], Fraction)
+
+combination = linear_combination([Vector([1, 2], element=Fraction), Vector([3, 5], element=Fraction)],
+                                 [Fraction(1, 3), Fraction(1, 2)])
+assert combination.is_exact and combination.items == [Fraction(11, 6), Fraction(19, 6)]
+
+# A streaming fit of observations added one by one, from a generator and in chunks recovers the exact line,
+# whatever the scale of the data
+for scale in (1.0, 1e-12, 1e12):
+    solver = LeastSquares(2)
+    solver.add(Vector(scale, 0.0 * scale), 2.0 * scale)
+    solver.add_rows(((scale, k * scale), (2.0 + 3.0 * k) * scale) for k in (1.0, 2.0))
+    solver.add_chunk(Matrix.from_rows([[scale, 3.0 * scale], [scale, 4.0 * scale]]), [11.0 * scale, 14.0 * scale])
+
+    assert solver.count == 5 and solver.rank == 2
+    assert max(abs(x - y) for x, y in zip(solver.coefficients, [2.0, 3.0])) < 1e-9
+    assert solver.residual < 1e-9 * scale
+
+# Dependent columns are dropped from the fit
+dependent_fit = LeastSquares(2)
+dependent_fit.add_rows(((k, 2.0 * k), 3.0 * k) for k in (1.0, 2.0, 3.0))
+
+assert dependent_fit.rank == 1 and max(abs(x - y) for x, y in zip(dependent_fit.coefficients, [3.0, 0.0])) < 1e-9
+
+# Both orthogonalization methods give orthonormal columns, modified Gram-Schmidt leaves a zero column of Q and
+# a zero diagonal entry of R for each dependent input instead
+dependent = Matrix.from_columns([[1.0, 2.0, 3.0, 4.0], [1.0, 0.0, 1.0, 0.0], [2.0, 4.0, 6.0, 8.0]])
+
+for m, independent in ((random_matrix(7, 4), 4), (dependent, 2)):
+    for method in (qr.HOUSEHOLDER, qr.MGS):
+        for pivoting in (False, True):
+            q, r = qr.qr(m, method, pivoting)[:2]
+            columns = [c for c in (q.column(j) for j in range(q.cols)) if c.length > 0.5]
+
+            assert len(columns) == (q.cols if method == qr.HOUSEHOLDER else independent)
+            assert all(abs(x * y - (i == j)) < 1e-9 for i, x in enumerate(columns) for j, y in enumerate(columns))
+            assert method == qr.HOUSEHOLDER or len([i for i in range(r.rows) if r[i][i] != 0.0]) == independent
+
+# Gram-Schmidt rejects vectors that are not a basis
+try:
+    gram_schmidt([dependent.column(j) for j in range(3)])
+    assert False, "Dependent vectors were orthogonalized"
+except AssertionError as e:
+    assert str(e) == "Vectors are not a basis"
+
+# Eigenvectors of a symmetric matrix reconstruct it, and the eigenvalues give its definiteness and quadratic forms
+half = random_matrix(5, 5)
+symmetric = Matrix.from_rows([[half[i][j] + half[j][i] for j in range(5)] for i in range(5)])
+eigenvalues, eigenvectors = symmetric_eigen(symmetric)
+spectrum = Matrix.from_rows([[eigenvalues[i] if i == j else 0.0 for j in range(5)] for i in range(5)])
+
+assert eigenvalues == sorted(eigenvalues)
+assert max_difference(eigenvectors * spectrum * transposed(eigenvectors), symmetric) < 1e-9
+assert definiteness(transposed(half) * half) in (POSITIVE_DEFINITE, POSITIVE_SEMIDEFINITE)
+assert abs(quadratic(symmetric, eigenvectors.column(0)) - eigenvalues[0]) < 1e-9
+
+# Text matrices load in bulk, and ones with rows of different lengths are rejected
+handle, path = tempfile.mkstemp()
+os.write(handle, '1,2\n\n3,4\n')
+os.close(handle)
+
+assert Matrix.load_text(path, ',').items == Matrix.from_rows([[1, 2], [3, 4]]).items
+
+with open(path, 'w') as f:
+    f.write('1 2\n3 4 5\n')
+
+try:
+    Matrix.load_text(path)
+    assert False, "A ragged text matrix was loaded"
+except DiskFormatError:
+    pass
+finally:
+    os.remove(path)
+
+# Out-of-core products and factorizations under a tiny memory budget match the in-memory ones, results are
+# memory-mapped from temporary files unless a path is given
+square = random_matrix(23, 23)
+tiled_product = tiled.gemm(square, transposed(square), memory_budget=4096)
+
+assert storage.is_mapped(tiled_product.buffer)
+assert max_difference(tiled_product, square * transposed(square)) < 1e-12
+assert abs(tiled.det(square, memory_budget=4096) - det(square)) <= 1e-9 * abs(det(square))
+
+factorized = tiled.copy(square)
+permutation, sign = tiled.lu(factorized, memory_budget=4096)
+lower = Matrix.from_rows([[factorized[i][j] if j < i else float(i == j) for j in range(23)] for i in range(23)])
+upper = Matrix.from_rows([[factorized[i][j] if j >= i else 0.0 for j in range(23)] for i in range(23)])
+
+assert max_difference(lower * upper, Matrix.from_rows([square[i].values() for i in permutation])) < 1e-9
+
+# Tiles of a parallel product are all computed, by lazy executors, thread and process pools and processes alike
+lhs, rhs = random_matrix(20, 13), random_matrix(13, 17)
+product = lhs * rhs
+
+assert max_difference(lhs.multiply(rhs, executor=LazyExecutor(), tile_size=8), product) < 1e-12
+assert max_difference(lhs.multiply(rhs, executor=ThreadPool(2), tile_size=8), product) < 1e-12
+assert max_difference(lhs.multiply(rhs, tile_size=8, processes=2), product) < 1e-12
+assert max_difference(lhs.multiply(rhs, tile_size=8, processes=1), product) < 1e-12
+
+process_pool = Pool(2)
+
+try:
+    assert max_difference(lhs.multiply(rhs, executor=process_pool, tile_size=8), product) < 1e-12
+finally:
+    process_pool.close()
+    process_pool.join()
+
+# Every integration method reaches the requested accuracy on smooth integrands, vectorized or not
+for method in ('gauss-kronrod', 'simpson', 'romberg'):
+    sine = integrate(sin, 0.0, 3.0, 1e-10, method)
+    batched = integrate(lambda xs: [x * x for x in xs], -1.0, 2.0, 1e-10, method, vectorized=True)
+
+    assert sine.status == 'converged' and abs(sine.value - (1.0 - cos(3.0))) < 1e-9
+    assert batched.status == 'converged' and abs(batched.value - 3.0) < 1e-9
+
+assert abs(gauss_kronrod(Polynomial(3, 0, 0), 0.0, 1.0).value - 1.0) < 1e-12
+assert abs(romberg(lambda x: 1.0 / (1.0 + x * x), 0.0, 1.0).value - atan(1.0)) < 1e-9
+
+# Accelerated iterations reach the fixed points of scalar and vector maps, maps without one are reported
+for method in ('picard', 'steffensen', 'anderson'):
+    assert abs(iterate(cos, 0.0, method=method).value - 0.7390851332151607) < 1e-9
+
+contraction = lambda v: Vector(0.5 * cos(v[1]), 0.5 * sin(v[0]) + 0.25)
+report = iterate(contraction, Vector(0.0, 0.0), method='anderson')
+
+assert report.status == 'converged' and (contraction(report.value) - report.value).length < 1e-9
+assert iterate(cos, 0.0, method='steffensen').evaluations < iterate(cos, 0.0).evaluations
+assert iterate(lambda x: -x, 1.0, max_iterations=50).status == 'max iterations'
+
+try:
+    fixed_point(lambda x: -x, 1.0)
+    assert False, "A fixed point of a map without one was returned"
+except FixedPointError:
+    pass
+
+# Polynomial division round-trips through a product with the divisor, zero results compare equal to zero and
+# greatest common divisors take numbers too
+dividend, divisor = Polynomial(3, -2, 0, 5, 7, -1), Polynomial(1, 4, -3)
+quotient, remainder = divmod(dividend, divisor)
+
+assert remainder.power < divisor.power
+assert quotient * divisor + remainder == dividend
+assert dividend - dividend == Polynomial(0) and (dividend * 0).power == 0
+assert dividend.gcd(3) == Polynomial(1) and divisor.gcd(0) == divisor * (1.0 / divisor.coefficients[0])
+
+# Interpolation reproduces polynomials and stays accurate at many Chebyshev nodes
+nodes = [cos(pi * (k + 0.5) / 32) for k in range(32)]
+samples = [random.uniform(-1.0, 1.0) for x in nodes]
+interpolant = interpolate(nodes, samples)
+
+assert max(abs(x - y) for x, y in zip(interpolate(range(6), dividend.evaluate_many(range(6))).coefficients,
+                                      dividend.coefficients)) < 1e-9
+assert max(abs(interpolant(x) - y) for x, y in zip(nodes, samples)) < 1e-3
+
+# Short vectors have no instance dictionary, their unrolled kernels agree with the generic loops of longer
+# vectors, strided views and exact elements
+for size in (2, 3, 4):
+    left, right = Vector([random.uniform(-1.0, 1.0) for _ in range(size)]), Vector(range(1, size + 1))
+    padded_left, padded_right = Vector(list(left) + [0.0]), Vector(list(right) + [0])
+    strided = Vector.view(array('d', [v for x in right for v in (x, -1.0)]), 0, size, 2)
+
+    assert not hasattr(left, '__dict__')
+    assert list(left + right) == list(padded_left + padded_right)[:size] == list(left + strided)
+    assert list(left - right) == list(padded_left - padded_right)[:size] == list(left - list(right))
+    assert list(2.5 * left) == list(2.5 * padded_left)[:size]
+    assert abs(left * right - padded_left * padded_right) < 1e-12 and left * right == left * strided
+    assert (Vector(range(size), element=Fraction) + Vector([Fraction(1, 3)] * size, element=Fraction)).items == \
+        [k + Fraction(1, 3) for k in range(size)]
+
+# Substitutions of an LU solve are timed apart from the back substitution of a Gauss-Jordan elimination
+with instrumentation.instrument() as report:
+    LU(a).solve(Vector(1, 1, 1, 1, 1, 1))
+
+assert 'lu back substitution' in report.phases and 'back substitution' not in report.phases
+
+# Evaluated expressions never share a buffer with their operands
+assert lazy(a).evaluate().buffer is not a.buffer and lazy(a).T.evaluate().buffer is not a.buffer
+
+# Vectors leave sums and differences with expressions to the expressions
+left, right = Vector(1, 2, 3), Vector(4, 5, 6)
+
+assert (left + lazy(right)).evaluate() == left + right and (left - lazy(right)).evaluate() == left - right